@@ -1,4 +1,6 @@
 import pandas as pd
+from schedule_dates import display_end_dates
+from dynamics_schema import apply_dynamics_schema
 
 def finalize_game_info_df(game_info: pd.DataFrame) -> pd.DataFrame:
     """
@@ -13,25 +15,6 @@ def finalize_game_info_df(game_info: pd.DataFrame) -> pd.DataFrame:
     """
     print("Starting finalization of game info DataFrame.")
     
-    # Define new columns and their default values
-    new_columns = {
-        "Multiple Dates or Times": "No", "Event Category": "Sports", "Age Range": "All", 
-        "Owner": "Coates, Anita", "Fulfillment Method": "Manual", "Fulfillment Type": "",
-        "Fulfillment Date": "", "Enforce Quantity Limit": "No", "Maximum Tickets": "", 
-        "Split Groups": "", "Volunteer Event": "", "Volunteers Assigned": "", "Ticket Delivery Method": "",
-        "Ticket Instructions": "", "Ticket Instruction Details": "", "Display On Web": "No", 
-        "Display Delivery Method": "No", "Allow Date Selection": "No", "Allow Time Selection": "No", 
-        "More Information Title": "", "More Information Url": "", "Web URL": "", "Address Line 1": "",
-        "Address Line 2": "", "Address Line 3": "", "City": "", "State or Province": "", "Postal Code": "",
-        "County": "", "Market": "", "Metro Area": "", "Country": "", "Contact Name": "", "Contact Email": "",
-        "Contact Phone": "", "TFK Area": "", "TFK Market": "", "TFK Region": "", "Total Requested": "", 
-        "Total Distributed": "", "Total Donated": "", "Total Remaining": ""
-    }
-
-    # Add new columns to the DataFrame
-    game_info = game_info.assign(**new_columns)
-    print("Added new columns with default values.")
-    
     # Append the current year to 'Game Date'
     current_year = pd.Timestamp.now().year
     game_info['Game Date'] = game_info['Game Date'] + f", {current_year}"
@@ -57,13 +40,8 @@ def finalize_game_info_df(game_info: pd.DataFrame) -> pd.DataFrame:
     game_info["Display Start Date"] = pd.Timestamp.today().normalize()
     print("Created 'Display Start Date' column.")
     
-    # Function to calculate 'Display End Date' based on game start day
-    def get_display_end_date(start_date):
-        return start_date if start_date.weekday() < 5 else start_date - pd.DateOffset(days=(start_date.weekday() - 4))
-    
-    game_info["Display End Date"] = game_info["Start Date"].apply(get_display_end_date)
-    game_info["Display End Date"] = pd.to_datetime(game_info["Display End Date"], errors="coerce")
-    game_info["Display End Date"] = game_info["Display End Date"].dt.date
+    # 'Display End Date' is the game day, or the Friday before for weekend games
+    game_info["Display End Date"] = display_end_dates(game_info["Start Date"]).dt.date
     print("Created 'Display End Date' column.")
     
     # Rename 'Event Name' to 'Name' if it exists
@@ -71,25 +49,9 @@ def finalize_game_info_df(game_info: pd.DataFrame) -> pd.DataFrame:
         game_info = game_info.rename(columns={"Event Name": "Name"})
         print("Renamed 'Event Name' to 'Name'.")
     
-    # Define the desired column order
-    desired_columns = [
-        'Name', 'Description', 'Start Date', 'End Date', 'Multiple Dates or Times', 'Event Category', 'Age Range', 'Owner', 
-        'Fulfillment Method', 'Fulfillment Type', 'Fulfillment Date', 'Enforce Quantity Limit', 'Maximum Tickets', 
-        'Split Groups', 'Volunteer Event', 'Volunteers Assigned', 'Ticket Delivery Method', 'Ticket Instructions', 
-        'Ticket Instruction Details', 'Display On Web', 'Display Delivery Method', 'Allow Date Selection', 
-        'Allow Time Selection', 'Display Start Date', 'Display End Date', 'More Information Title', 'More Information Url', 
-        'Web URL', 'Venue', 'Address Line 1', 'Address Line 2', 'Address Line 3', 'City', 'State or Province', 
-        'Postal Code', 'County', 'Market', 'Metro Area', 'Country', 'Contact Name', 'Contact Email', 'Contact Phone', 
-        'TFK Area', 'TFK Market', 'TFK Region', 'Total Requested', 'Total Distributed', 'Total Donated', 'Total Remaining'
-    ]
-    
-    # Remove any columns not in the desired list
-    game_info = game_info[[col for col in desired_columns if col in game_info.columns]]
-    print("Removed columns that were not in the desired list.")
-    
-    # Reorder the columns based on the desired order
-    game_info = game_info[desired_columns]
-    print("Reordered DataFrame columns to match the desired order.")
+    # Add the constant Dynamics columns and reorder to the export layout
+    game_info = apply_dynamics_schema(game_info, strict=True)
+    print("Added constant columns and reordered DataFrame columns to match the desired order.")
 
     return game_info
 
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+
+# USD per million (input, output) tokens; batch jobs are billed at half price
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+}
+BATCH_DISCOUNT = 0.5
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values`, or None if there are none."""
+    values = sorted(values)
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class CallMetrics:
+    """
+    Per-call record of the model requests made during a run.
+
+    Each call keeps its token usage, wall latency (including retries), retry
+    count, time spent in backoff sleeps and time spent waiting on the client-side
+    rate limiter. `summary()` rolls them up into totals, percentiles and an
+    estimated cost. Thread-safe.
+
+    Parameters:
+        model (str): Model name, used to look up MODEL_PRICES.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._lock = threading.Lock()
+        self._calls = []
+
+    def record(self, latency=None, retries=0, backoff=0.0, rate_limit_wait=0.0,
+               prompt_tokens=0, completion_tokens=0, ok=True, batch=False):
+        with self._lock:
+            self._calls.append({
+                "latency": latency,
+                "retries": retries,
+                "backoff": backoff,
+                "rate_limit_wait": rate_limit_wait,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "ok": ok,
+                "batch": batch,
+            })
+
+    def _cost(self, call):
+        input_price, output_price = MODEL_PRICES.get(self.model, (0.0, 0.0))
+        cost = (call["prompt_tokens"] * input_price + call["completion_tokens"] * output_price) / 1_000_000
+        return cost * BATCH_DISCOUNT if call["batch"] else cost
+
+    def summary(self):
+        with self._lock:
+            calls = list(self._calls)
+
+        def distribution(values):
+            stats = {f"p{q}": round(percentile(values, q), 3) if values else None for q in (50, 90, 95, 99)}
+            stats["max"] = round(max(values), 3) if values else None
+            return stats
+
+        latencies = [call["latency"] for call in calls if call["latency"] is not None]
+        return {
+            "model": self.model,
+            "calls": len(calls),
+            "failed_calls": sum(not call["ok"] for call in calls),
+            "batch_calls": sum(call["batch"] for call in calls),
+            "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+            "completion_tokens": sum(call["completion_tokens"] for call in calls),
+            "estimated_cost_usd": round(sum(self._cost(call) for call in calls), 4),
+            "retries": sum(call["retries"] for call in calls),
+            "backoff_seconds": round(sum(call["backoff"] for call in calls), 3),
+            "rate_limit_wait_seconds": round(sum(call["rate_limit_wait"] for call in calls), 3),
+            "latency_seconds": distribution(latencies),
+            "prompt_tokens_per_call": distribution([call["prompt_tokens"] for call in calls if call["ok"]]),
+            "completion_tokens_per_call": distribution([call["completion_tokens"] for call in calls if call["ok"]]),
+        }
+
+    def summary_lines(self):
+        summary = self.summary()
+        latency = summary["latency_seconds"]
+        return [
+            f"{summary['calls']} call(s) to {self.model}, {summary['failed_calls']} failed, "
+            f"{summary['prompt_tokens']} prompt + {summary['completion_tokens']} completion tokens, "
+            f"~${summary['estimated_cost_usd']:.4f}",
+            f"latency p50 {latency['p50'] or 0:.2f}s, p95 {latency['p95'] or 0:.2f}s, max {latency['max'] or 0:.2f}s; "
+            f"{summary['retries']} retries, {summary['backoff_seconds']:.1f}s in backoff, "
+            f"{summary['rate_limit_wait_seconds']:.1f}s waiting on the rate limiter",
+        ]
+
+    def write_report(self, path):
+        """Write the summary as JSON to `path` (e.g. next to the run's exports)."""
+        report = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **self.summary()}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, path)
+        print(f"✅ Description metrics saved to: {path}")
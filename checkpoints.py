@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CHECKPOINT_DIR_ENV = "SCRAPER_CHECKPOINT_DIR"
+DEFAULT_CHECKPOINT_DIR = "/app/static/checkpoints"
+CHECKPOINT_COMPRESSION = "zstd"
+# Schema metadata entry holding the key a checkpoint was written under
+_KEY_FIELD = b"checkpoint_key"
+
+
+def _hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def frame_hash(df):
+    """Hash of a DataFrame's columns, dtypes and values."""
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return _hash([list(map(str, df.columns)), list(map(str, df.dtypes)), hashlib.sha256(rows.tobytes()).hexdigest()])
+
+
+def input_hash(value):
+    """Hash of a stage input: DataFrames by content, anything else by its JSON form."""
+    if isinstance(value, pd.DataFrame):
+        return frame_hash(value)
+    return _hash(value)
+
+
+def code_version(fn, *modules):
+    """Hash of the source of the module defining `fn` plus any extra `modules` it depends on."""
+    sources = [inspect.getsource(inspect.getmodule(fn))]
+    sources += [inspect.getsource(module) for module in modules]
+    return _hash(sources)
+
+
+class StageCheckpoints:
+    """
+    Parquet checkpoints of pipeline stage outputs, reused while a stage's inputs
+    and code are unchanged.
+
+    Each output is saved under a key hashing the stage name, its arguments
+    (DataFrames by content) and the source of the code that produced it, so
+    rerunning after a late failure or after fixing a later stage skips every
+    stage before it. Checkpoints are written atomically; prune() removes those
+    this run did not use, so each stage keeps only its latest outputs.
+    Thread-safe.
+
+    Parameters:
+        checkpoint_dir (str): Directory of checkpoints (default: $SCRAPER_CHECKPOINT_DIR
+                              or /app/static/checkpoints).
+    """
+
+    def __init__(self, checkpoint_dir=None):
+        self.checkpoint_dir = checkpoint_dir or os.getenv(CHECKPOINT_DIR_ENV, DEFAULT_CHECKPOINT_DIR)
+        self._lock = threading.Lock()
+        self._used = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, stage, fn, args, kwargs, inputs, code):
+        key = _hash([
+            stage,
+            [input_hash(arg) for arg in args],
+            {name: input_hash(value) for name, value in kwargs.items()},
+            inputs,
+            code_version(fn, *code),
+        ])
+        path = os.path.join(self.checkpoint_dir, stage, f"{key[:32]}.parquet")
+        with self._lock:
+            self._used.setdefault(stage, set()).add(path)
+        return path, key
+
+    def _load(self, stage, path, key):
+        try:
+            if pq.read_schema(path).metadata.get(_KEY_FIELD) != key.encode():
+                return None
+            df = pq.read_table(path).to_pandas()
+        except (OSError, pa.ArrowException):
+            return None
+        with self._lock:
+            self.hits += 1
+        print(f"✅ Reusing {stage} checkpoint ({len(df)} rows): {path}")
+        return df
+
+    def _save(self, stage, path, key, df, complete):
+        # Returns the output as it reads back from the checkpoint, so the next stage's
+        # input hash is the same whether this stage ran or was reused
+        with self._lock:
+            self.misses += 1
+        if not isinstance(df, pd.DataFrame) or (complete is not None and not complete(df)):
+            return df
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _KEY_FIELD: key.encode()})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp_path, compression=CHECKPOINT_COMPRESSION)
+        os.replace(tmp_path, path)
+        return table.to_pandas()
+
+    def run(self, stage, fn, *args, inputs=None, code=(), complete=None, **kwargs):
+        """
+        fn(*args, **kwargs), or its saved output when nothing it depends on changed.
+
+        Parameters:
+            stage (str): Stage name; checkpoints are kept per stage.
+            fn (callable): Stage function returning a DataFrame (None is not saved).
+            inputs: Extra JSON-able inputs not passed as arguments (e.g. the day a scrape is for).
+            code (tuple): Modules besides `fn`'s own whose source the output depends on.
+            complete (callable): DataFrame -> bool; outputs failing it are returned but not saved.
+
+        Returns:
+            The stage output.
+        """
+        path, key = self._path(stage, fn, args, kwargs, inputs, code)
+        df = self._load(stage, path, key)
+        if df is None:
+            df = self._save(stage, path, key, fn(*args, **kwargs), complete)
+        return df
+
+    def stage(self, stage, fn, inputs=None, code=(), complete=None):
+        """`fn` wrapped to checkpoint each payload, for use as a pipeline.Stage function."""
+        if not asyncio.iscoroutinefunction(fn):
+            return lambda payload: self.run(stage, fn, payload, inputs=inputs, code=code, complete=complete)
+
+        async def checkpointed(payload):
+            path, key = self._path(stage, fn, (payload,), {}, inputs, code)
+            df = await asyncio.to_thread(self._load, stage, path, key)
+            if df is None:
+                df = await asyncio.to_thread(self._save, stage, path, key, await fn(payload), complete)
+            return df
+
+        return checkpointed
+
+    def prune(self):
+        """Delete checkpoints of the stages run so far that this run did not use."""
+        with self._lock:
+            used = {stage: set(paths) for stage, paths in self._used.items()}
+        for stage, paths in used.items():
+            stage_dir = os.path.join(self.checkpoint_dir, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for name in os.listdir(stage_dir):
+                path = os.path.join(stage_dir, name)
+                if path not in paths:
+                    os.remove(path)
+        print(f"Stage checkpoints: {self.hits} reused, {self.misses} run.")
@@ -0,0 +1,108 @@
+import json
+import os
+import time
+
+BATCH_STATE_ENV = "DESCRIPTION_BATCH_STATE"
+DEFAULT_BATCH_STATE = "/app/static/description_batch.json"
+BATCH_ENDPOINT = "/v1/chat/completions"
+POLL_INTERVAL = float(os.getenv("DESCRIPTION_BATCH_POLL_SECONDS", "30"))
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchPending(Exception):
+    """A submitted description batch has not finished yet; rerun to resume it."""
+
+    def __init__(self, batch_id, status):
+        super().__init__(f"description batch {batch_id} is {status}")
+        self.batch_id = batch_id
+        self.status = status
+
+
+def batch_state_path():
+    return os.getenv(BATCH_STATE_ENV, DEFAULT_BATCH_STATE)
+
+
+def load_pending_batch(state_path):
+    """State of the batch submitted by an earlier run, or None."""
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def clear_pending_batch(state_path):
+    try:
+        os.remove(state_path)
+    except FileNotFoundError:
+        pass
+
+
+def submit_batch(client, requests, state_path):
+    """
+    Write `requests` as a batch input file, upload it and start the batch job.
+
+    Parameters:
+        client (OpenAI): Client whose base URL serves the files and batches endpoints.
+        requests (list): (custom_id, request body) pairs.
+        state_path (str): Where the pending batch is recorded so later runs can resume it.
+
+    Returns:
+        dict: The saved batch state.
+    """
+    input_path = os.path.splitext(state_path)[0] + ".jsonl"
+    os.makedirs(os.path.dirname(input_path) or ".", exist_ok=True)
+    with open(input_path, "w", encoding="utf-8") as f:
+        for custom_id, body in requests:
+            f.write(json.dumps({"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}) + "\n")
+
+    with open(input_path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h"
+    )
+    state = {"batch_id": batch.id, "input_path": input_path, "requests": len(requests), "submitted_at": time.time()}
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+    print(f"🔧 Submitted description batch {batch.id} ({len(requests)} request(s)).")
+    return state
+
+
+def poll_batch(client, batch_id, wait=True, poll_interval=POLL_INTERVAL):
+    """Return the batch once it reaches a final status; raise BatchPending if not waiting."""
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        if not wait:
+            raise BatchPending(batch_id, batch.status)
+        time.sleep(poll_interval)
+
+
+def read_batch_results(client, batch):
+    """{custom_id: (message content, token usage)} for every request the batch answered successfully."""
+    if batch.status != "completed":
+        print(f"Description batch {batch.id} ended as {batch.status}.")
+    if not batch.output_file_id:
+        return {}
+
+    results = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            continue
+        try:
+            results[entry["custom_id"]] = (
+                response["body"]["choices"][0]["message"]["content"],
+                response["body"].get("usage") or {}
+            )
+        except (KeyError, IndexError, TypeError):
+            continue
+    return results
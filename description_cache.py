@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+import threading
+
+DESCRIPTION_CACHE_ENV = "DESCRIPTION_CACHE_PATH"
+DEFAULT_DESCRIPTION_CACHE = "/app/static/description_cache.json"
+
+
+def normalize_prompt_field(value):
+    """Case- and whitespace-insensitive form of a prompt input; missing values become ''."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return " ".join(str(value).split()).lower()
+
+
+def prompt_fingerprint(*fields):
+    """Stable key for a prompt built from `fields` (model, league, promo, time, ...)."""
+    normalized = "\x1f".join(normalize_prompt_field(field) for field in fields)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class DescriptionCache:
+    """
+    Persistent pool of generated descriptions per prompt fingerprint.
+
+    Each key keeps up to `max_variants` generated descriptions, so games sharing a
+    promo can be handed different wording without paying for one call per game.
+    Thread-safe; call `save()` to persist.
+
+    Parameters:
+        path (str): JSON file backing the cache.
+        max_variants (int): Descriptions kept per prompt.
+    """
+
+    def __init__(self, path=None, max_variants=3):
+        self.path = path or os.getenv(DESCRIPTION_CACHE_ENV, DEFAULT_DESCRIPTION_CACHE)
+        self.max_variants = max_variants
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._variants = json.load(f)
+        except (OSError, ValueError):
+            self._variants = {}
+
+    def variants(self, key):
+        with self._lock:
+            return list(self._variants.get(key, ()))
+
+    def add(self, key, description):
+        with self._lock:
+            pool = self._variants.setdefault(key, [])
+            if len(pool) < self.max_variants:
+                pool.append(description)
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._variants, f)
+            os.replace(tmp_path, self.path)
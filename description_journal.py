@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import threading
+
+DESCRIPTION_JOURNAL_ENV = "DESCRIPTION_JOURNAL_PATH"
+DEFAULT_DESCRIPTION_JOURNAL = "/app/static/description_journal.jsonl"
+# Fields that identify a game across runs
+GAME_ID_COLUMNS = ["Home Team", "Away Team", "Game Date", "Game Time"]
+
+
+def game_id(row):
+    """Stable id of a game, derived from the fields in GAME_ID_COLUMNS."""
+    values = [str(row[col]) if col in row.index else "" for col in GAME_ID_COLUMNS]
+    return hashlib.sha256("\x1f".join(values).encode("utf-8")).hexdigest()[:16]
+
+
+class DescriptionJournal:
+    """
+    Append-only record of the descriptions finished for each game.
+
+    Every description is written (and flushed to disk) as soon as it comes back,
+    so a run that dies partway through loses nothing it already paid for. On
+    load, later lines win and a line cut off by a crash is ignored; the file is
+    then compacted to one line per game if it held any superseded or broken
+    lines. Thread-safe.
+
+    Parameters:
+        path (str): JSONL file, one {"game_id", "prompt", "description"} object per line.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv(DESCRIPTION_JOURNAL_ENV, DEFAULT_DESCRIPTION_JOURNAL)
+        self._lock = threading.Lock()
+        self._entries = {}
+        lines = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                        self._entries[entry["game_id"]] = (entry["prompt"], entry["description"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            pass
+        if lines > len(self._entries):
+            self._compact()
+
+    @staticmethod
+    def _line(game_id, prompt_key, description):
+        return json.dumps({"game_id": game_id, "prompt": prompt_key, "description": description}) + "\n"
+
+    def _compact(self):
+        # Rewrite the journal with only the latest line per game
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(
+                self._line(game_id, prompt_key, description)
+                for game_id, (prompt_key, description) in self._entries.items()
+            ))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def get(self, game_id, prompt_key):
+        """Journaled description for `game_id`, if it was generated from the same prompt."""
+        with self._lock:
+            entry = self._entries.get(game_id)
+        if entry is None or entry[0] != prompt_key:
+            return None
+        return entry[1]
+
+    def record(self, game_id, prompt_key, description):
+        self.record_many([(game_id, prompt_key, description)])
+
+    def record_many(self, entries):
+        """Append (game_id, prompt_key, description) entries with a single write."""
+        if not entries:
+            return
+        lines = "".join(self._line(game_id, prompt_key, description) for game_id, prompt_key, description in entries)
+        with self._lock:
+            for game_id, prompt_key, description in entries:
+                self._entries[game_id] = (prompt_key, description)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,143 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+POOL_SIZE_ENV = "SCRAPER_POOL_SIZE"
+DEFAULT_POOL_SIZE = 1
+# How long to keep retrying session creation while the Selenium hub boots.
+DRIVER_STARTUP_TIMEOUT = 30
+
+
+def resolve_pool_size(pool_size=None):
+    """
+    Resolve how many concurrent browser sessions to use.
+
+    An explicit `pool_size` (e.g. from the CLI) wins, then the SCRAPER_POOL_SIZE
+    environment variable, then DEFAULT_POOL_SIZE.
+    """
+    if pool_size is None:
+        pool_size = os.getenv(POOL_SIZE_ENV, DEFAULT_POOL_SIZE)
+    try:
+        pool_size = int(pool_size)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid pool size '{pool_size}': must be a positive integer")
+    if pool_size < 1:
+        raise ValueError(f"Invalid pool size '{pool_size}': must be a positive integer")
+    return pool_size
+
+
+class DriverPool:
+    """
+    Bounded pool of Selenium WebDriver sessions shared by worker threads.
+
+    Sessions are created lazily with `driver_factory` (e.g. `init_driver`) up to
+    `size`, so a pool of 4 against the Selenium hub opens at most 4 remote sessions.
+    A session that raises while checked out is discarded and replaced on demand.
+    Session creation is retried for up to `startup_timeout` seconds, so the hub
+    can still be starting up when the first session is requested.
+    """
+
+    def __init__(self, driver_factory, size=None, startup_timeout=DRIVER_STARTUP_TIMEOUT):
+        self.driver_factory = driver_factory
+        self.size = resolve_pool_size(size)
+        self.startup_timeout = startup_timeout
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._all = []
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if not create:
+            return self._idle.get()
+        try:
+            driver = self._create()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._all.append(driver)
+        return driver
+
+    def _create(self):
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                return self.driver_factory()
+            except ValueError:
+                raise
+            except Exception as e:
+                if time.monotonic() >= deadline:
+                    raise
+                print(f"Browser session not available yet ({e.__class__.__name__}), retrying...")
+                time.sleep(1)
+
+    def _discard(self, driver):
+        with self._lock:
+            self._created -= 1
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing broken driver: {e}")
+
+    @contextmanager
+    def driver(self):
+        """Check out a driver for the duration of the `with` block."""
+        driver = self._acquire()
+        try:
+            yield driver
+        except Exception:
+            self._discard(driver)
+            raise
+        else:
+            self._idle.put(driver)
+
+    def map(self, fn, items):
+        """
+        Run `fn(driver, item)` for every item across the pool.
+
+        Results are returned in the order of `items`, regardless of which
+        session finished first, so merged output is deterministic.
+        """
+        items = list(items)
+
+        def run(item):
+            with self.driver() as driver:
+                return fn(driver, item)
+
+        if self.size == 1:
+            return [run(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(run, items))
+
+    def close(self):
+        with self._lock:
+            drivers, self._all = self._all, []
+            self._created = 0
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing driver: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+# Column layout of the Dynamics event import, shared by every league
+DYNAMICS_COLUMNS = [
+    'Name', 'Description', 'Start Date', 'End Date', 'Multiple Dates or Times', 'Event Category', 'Age Range',
+    'Owner', 'Fulfillment Method', 'Fulfillment Type', 'Fulfillment Date', 'Enforce Quantity Limit',
+    'Maximum Tickets', 'Split Groups', 'Volunteer Event', 'Volunteers Assigned', 'Ticket Delivery Method',
+    'Ticket Instructions', 'Ticket Instruction Details', 'Display On Web', 'Display Delivery Method',
+    'Allow Date Selection', 'Allow Time Selection', 'Display Start Date', 'Display End Date',
+    'More Information Title', 'More Information Url', 'Web URL', 'Venue', 'Address Line 1', 'Address Line 2',
+    'Address Line 3', 'City', 'State or Province', 'Postal Code', 'County', 'Market', 'Metro Area', 'Country',
+    'Contact Name', 'Contact Email', 'Contact Phone', 'TFK Area', 'TFK Market', 'TFK Region',
+    'Total Requested', 'Total Distributed', 'Total Donated', 'Total Remaining'
+]
+
+# Columns that hold the same value for every event
+DYNAMICS_CONSTANTS = {
+    "Multiple Dates or Times": "No", "Event Category": "Sports", "Age Range": "All",
+    "Owner": "Coates, Anita", "Fulfillment Method": "Manual", "Fulfillment Type": "",
+    "Fulfillment Date": "", "Enforce Quantity Limit": "No", "Maximum Tickets": "", "Split Groups": "",
+    "Volunteer Event": "", "Volunteers Assigned": "", "Ticket Delivery Method": "", "Ticket Instructions": "",
+    "Ticket Instruction Details": "", "Display On Web": "No", "Display Delivery Method": "No",
+    "Allow Date Selection": "No", "Allow Time Selection": "No", "More Information Title": "",
+    "More Information Url": "", "Web URL": "", "Address Line 1": "", "Address Line 2": "", "Address Line 3": "",
+    "City": "", "State or Province": "", "Postal Code": "", "County": "", "Market": "", "Metro Area": "",
+    "Country": "", "Contact Name": "", "Contact Email": "", "Contact Phone": "", "TFK Area": "",
+    "TFK Market": "", "TFK Region": "", "Total Requested": "", "Total Distributed": "",
+    "Total Donated": "", "Total Remaining": ""
+}
+
+
+def home_teams(names):
+    """Home team of each event, from 'Name' ("<home> vs. <away>"); NaN where there is no " vs"."""
+    return names.str.extract(r'^(.*?) vs')[0]
+
+
+def constant_column(value, length):
+    """A column repeating `value`, stored as one category plus a byte per row."""
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
+
+def apply_dynamics_schema(df, strict=False):
+    """
+    Add the constant Dynamics columns and put the frame in export column order.
+
+    The constants are categoricals with a single category, so they cost about one
+    byte per row instead of an object pointer per cell. They only expand to their
+    values when the frame is written with to_csv / to_excel, and the written
+    output is the same as with plain string columns.
+
+    Parameters:
+        df (pd.DataFrame): Event rows with the league-specific columns filled in.
+        strict (bool): Raise if any Dynamics column is missing instead of leaving it out.
+
+    Returns:
+        pd.DataFrame: The frame with DYNAMICS_COLUMNS (those present, unless strict) in order.
+    """
+    df = df.assign(**{col: constant_column(value, len(df)) for col, value in DYNAMICS_CONSTANTS.items()})
+    if strict:
+        return df[DYNAMICS_COLUMNS]
+    return df[[col for col in DYNAMICS_COLUMNS if col in df.columns]]
@@ -0,0 +1,159 @@
+import os
+from datetime import timedelta
+
+from bs4 import BeautifulSoup
+
+from page_readiness import SiteReadiness
+
+ESPN_BASE_URL = os.getenv("ESPN_BASE_URL", "https://www.espn.com")
+
+
+# Class of the placeholder ESPN renders instead of the tables for a date range without games
+ESPN_EMPTY_MARKER = "EmptyTable"
+
+
+def espn_page_ready(html):
+    """Cheap readiness check on raw HTML: the schedule tables (or the no-games placeholder) are rendered."""
+    return "Table__TBODY" in html or ESPN_EMPTY_MARKER in html
+
+
+# In the browser: wait until the schedule tables are present and no more are being added,
+# or the page shows that the week has no games
+ESPN_READINESS = SiteReadiness(
+    "espn.com",
+    html_check=espn_page_ready,
+    count_script="return document.querySelectorAll('.Table__TBODY tr').length;",
+    min_count=1,
+    max_timeout=10.0,
+    empty_script=f"return document.querySelector('.{ESPN_EMPTY_MARKER}') !== null;"
+)
+
+
+def _element_text(tag):
+    """
+    Mirror Selenium's WebElement.text for a parsed tag: the rendered text of
+    the element and its children with runs of whitespace collapsed.
+    """
+    return " ".join(tag.get_text(" ").split())
+
+
+def parse_espn_schedule(html):
+    """
+    Parse one ESPN `/schedule/_/date/` page into raw game records.
+
+    The whole page is taken in a single `driver.page_source` snapshot and parsed
+    in-process, instead of one WebDriver round trip per title, row and cell.
+
+    Parameters:
+        html (str): Page source of an ESPN NBA/NHL/WNBA schedule page.
+
+    Returns:
+        list[dict]: One dict per game with 'date', 'home_team', 'away_team' and 'time',
+                    in page order.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    titles = soup.find_all(class_="Table__Title")
+    tables = soup.find_all(class_="Table__TBODY")
+
+    results = []
+    for title, table in zip(titles, tables):
+        date_text = _element_text(title)
+        for row in table.find_all("tr"):
+            cols = row.find_all("td")
+            if len(cols) >= 3:
+                results.append({
+                    "date": date_text,
+                    "home_team": _element_text(cols[1]).replace("@", "").strip(),
+                    "away_team": _element_text(cols[0]),
+                    "time": _element_text(cols[2])
+                })
+    return results
+
+
+def shard_date_range(start_date, end_date, shards, step=timedelta(days=7)):
+    """
+    Split the week pages from `start_date` to `end_date` into at most `shards`
+    contiguous ranges. Shard boundaries stay on the same 7-day steps a serial
+    crawl would take, so the set of pages fetched is unchanged.
+    """
+    week_starts = []
+    current = start_date
+    while current <= end_date:
+        week_starts.append(current)
+        current += step
+    if not week_starts:
+        return []
+    shards = max(1, min(shards, len(week_starts)))
+    size, extra = divmod(len(week_starts), shards)
+    ranges = []
+    index = 0
+    for shard in range(shards):
+        count = size + (1 if shard < extra else 0)
+        ranges.append((week_starts[index], week_starts[index + count - 1]))
+        index += count
+    return ranges
+
+
+def scraped_window(start_date, end_date, step=timedelta(days=7)):
+    """
+    First and last day listed on the week pages scrape_espn_schedule fetches
+    from `start_date` to `end_date`; each page lists `step` days from its date,
+    so the window runs past `end_date` (None when no page is fetched).
+    """
+    if end_date < start_date:
+        return None
+    last_week_start = start_date + (end_date - start_date) // step * step
+    return start_date, last_week_start + step - timedelta(days=1)
+
+
+def dedupe_games(games):
+    """Drop games seen on an earlier (overlapping) week page, keyed on date, home and away."""
+    seen = set()
+    unique = []
+    for game in games:
+        key = (game["date"], game["home_team"], game["away_team"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(game)
+    return unique
+
+
+def scrape_espn_schedule(fetcher, league, start_date, end_date, shards=None):
+    """
+    Scrape an ESPN league schedule between two dates, one week page at a time.
+
+    The range is split into `shards` contiguous date ranges (default: the fetcher's
+    pool size) that are crawled concurrently, each on its own session. Shards are
+    merged in date order and games repeated across overlapping week pages are
+    dropped, so the result matches a serial crawl.
+
+    Parameters:
+        fetcher (PageFetcher): Source of page HTML.
+        league (str): ESPN league path, e.g. 'nba', 'nhl' or 'wnba'.
+        start_date, end_date (datetime): First and last week start to fetch.
+        shards (int): Number of concurrent date-range shards.
+
+    Returns:
+        list[dict]: Raw game records as returned by parse_espn_schedule.
+    """
+    delta = timedelta(days=7)
+
+    def scrape_shard(date_range):
+        shard_start, shard_end = date_range
+        current = shard_start
+        results = []
+        while current <= shard_end:
+            date_str = current.strftime("%Y%m%d")
+            url = f"{ESPN_BASE_URL}/{league}/schedule/_/date/{date_str}"
+            try:
+                html = fetcher.fetch(url, ready=ESPN_READINESS)
+                results.extend(parse_espn_schedule(html))
+            except Exception as e:
+                print(f"Error on {date_str}: {e}")
+            current += delta
+        return results
+
+    date_ranges = shard_date_range(start_date, end_date, shards or fetcher.pool_size, delta)
+    print(f"Scraping {league.upper()} schedule in {len(date_ranges)} shard(s).")
+    per_shard = fetcher.map(scrape_shard, date_ranges)
+    return dedupe_games([game for games in per_shard for game in games])
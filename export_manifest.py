@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# Columns that change on every run without the game changing (the export date); left out of the hashes
+VOLATILE_COLUMNS = ["Display Start Date"]
+CHANGE_COLUMN = "Change"
+
+
+def _hash(payload):
+    return hashlib.sha256(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path):
+    """Hash of a file's bytes (e.g. the Dynamics template)."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_manifest(manifest_path):
+    """Load the previous export's manifest, if any."""
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"teams": {}}
+
+
+def save_manifest(manifest_path, manifest):
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, manifest_path)
+
+
+def game_keys(df):
+    """
+    Key per game: its 'Name', start day and position among that matchup's games
+    on the same day, so doubleheaders get distinct keys and a new start time on
+    the same day shows up as a changed game rather than a removed and added one.
+    """
+    days = pd.to_datetime(df["Start Date"]).dt.strftime("%Y-%m-%d").fillna("TBD")
+    base = df["Name"].astype(str) + "|" + days
+    return (base + "|" + base.groupby(base).cumcount().astype(str)).tolist()
+
+
+def team_entry(file, df):
+    """
+    Manifest entry for one team file written from `df`.
+
+    Returns:
+        dict: {"file", "hash", "games": {game key: [row hash, start date]}}; the
+        team hash covers every game's hash in file order.
+    """
+    stable = df.drop(columns=[col for col in VOLATILE_COLUMNS if col in df.columns])
+    values = stable.astype(object).where(stable.notna(), None)
+    keys = game_keys(df)
+    row_hashes = [_hash(row) for row in values.itertuples(index=False, name=None)]
+    starts = df["Start Date"].astype(str).tolist()
+    return {
+        "file": file,
+        "hash": _hash(list(zip(keys, row_hashes))),
+        "games": {key: [row_hash, start] for key, row_hash, start in zip(keys, row_hashes, starts)},
+    }
+
+
+def workbook_hash(teams):
+    """Hash of the by-team workbook: every sheet name with its team hash, in sheet order."""
+    return _hash([[sheet_name, entry["hash"]] for sheet_name, entry in teams.items()])
+
+
+def write_delta(delta_path, team_frames, previous_teams, teams):
+    """
+    Write the games added, changed or removed since the previous export as CSV.
+
+    Added and changed games carry their full Dynamics row; removed games carry
+    only 'Name' and 'Start Date', which identify the event to withdraw.
+
+    Parameters:
+        delta_path (str): CSV to write (a header-only file when nothing changed).
+        team_frames (dict): Sheet name -> the DataFrame written to that team's file.
+        previous_teams (dict): The previous manifest's team entries.
+        teams (dict): This export's team entries (see team_entry).
+
+    Returns:
+        dict: Number of games per change type.
+    """
+    previous_games = {
+        key: game for entry in previous_teams.values() for key, game in entry["games"].items()
+    }
+    current_keys = set()
+    parts = []
+    for sheet_name, df in team_frames.items():
+        games = teams[sheet_name]["games"]
+        keys = list(games)
+        current_keys.update(keys)
+        changes = [
+            "added" if key not in previous_games else "changed" if previous_games[key][0] != games[key][0] else None
+            for key in keys
+        ]
+        delta = df.assign(**{CHANGE_COLUMN: changes})
+        parts.append(delta[delta[CHANGE_COLUMN].notna()])
+
+    removed = [
+        {CHANGE_COLUMN: "removed", "Name": key.rsplit("|", 2)[0], "Start Date": game[1]}
+        for key, game in previous_games.items()
+        if key not in current_keys
+    ]
+    parts.append(pd.DataFrame(removed, columns=[CHANGE_COLUMN, "Name", "Start Date"]))
+
+    parts = [part for part in parts if len(part)] or [pd.DataFrame(columns=[CHANGE_COLUMN])]
+    delta = pd.concat(parts, ignore_index=True)
+    delta = delta[[CHANGE_COLUMN] + [col for col in delta.columns if col != CHANGE_COLUMN]]
+    os.makedirs(os.path.dirname(delta_path) or ".", exist_ok=True)
+    delta.to_csv(delta_path, encoding="utf-8-sig", index=False)
+    return {change: int((delta[CHANGE_COLUMN] == change).sum()) for change in ("added", "changed", "removed")}
@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from driver_pool import DriverPool, resolve_pool_size
+from page_cache import PageCache
+from page_readiness import get_latency_tracker
+
+FETCH_MODE_ENV = "SCRAPER_FETCH_MODE"
+# 'auto': plain HTTP first, Selenium only for pages that fail the readiness check.
+# 'http': plain HTTP only, never start a browser.
+# 'browser': always render through Selenium (the original behaviour).
+# 'replay': serve every page from the page cache, with no network or browser use.
+FETCH_MODES = ("auto", "http", "browser", "replay")
+DEFAULT_FETCH_MODE = "auto"
+
+HTTP_TIMEOUT = 30
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Connection": "keep-alive",
+}
+
+
+def resolve_fetch_mode(mode=None):
+    """
+    Resolve the fetch mode: an explicit `mode` (e.g. from the CLI) wins, then the
+    SCRAPER_FETCH_MODE environment variable, then DEFAULT_FETCH_MODE.
+    """
+    mode = mode or os.getenv(FETCH_MODE_ENV) or DEFAULT_FETCH_MODE
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Unknown fetch mode '{mode}': must be one of {', '.join(FETCH_MODES)}")
+    return mode
+
+
+def build_session(pool_size):
+    """
+    Create a requests Session with keep-alive connections sized for `pool_size`
+    concurrent fetches, compressed transfer and retries on transient errors.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",)
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+
+class PageFetcher:
+    """
+    Fetch schedule pages as HTML for the existing parsers.
+
+    Pages are requested over a pooled keep-alive HTTP session. A page whose HTML
+    fails its `ready(html)` check (e.g. the MLB 'list-mode' div is missing because
+    the page needs JavaScript) is re-rendered through a Selenium session from a
+    lazily started DriverPool, so no browser is opened unless a page needs one.
+
+    Pages that pass the readiness check are stored in the page cache, and served
+    from it on later fetches the same day. In 'replay' mode every page comes from
+    the cache, so a whole run can be repeated offline.
+
+    Parameters:
+        driver_factory: callable returning a WebDriver (e.g. `init_driver`), or None
+                        to disable the browser fallback.
+        pool_size: maximum concurrent fetches and browser sessions.
+        mode: 'auto', 'http', 'browser' or 'replay' (see FETCH_MODES).
+        cache: PageCache to use; defaults to PageCache.from_env().
+    """
+
+    def __init__(self, driver_factory=None, pool_size=None, mode=None, cache=None):
+        self.mode = resolve_fetch_mode(mode)
+        self.pool_size = resolve_pool_size(pool_size)
+        self.cache = cache if cache is not None else PageCache.from_env()
+        if self.mode == "replay" and self.cache is None:
+            raise ValueError("Replay mode needs the page cache; set SCRAPER_CACHE_TTL_HOURS above 0")
+        self.session = build_session(self.pool_size)
+        self.drivers = DriverPool(driver_factory, self.pool_size) if driver_factory and self.mode != "replay" else None
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._stats_lock = threading.Lock()
+        self.stats = {"http": 0, "browser": 0, "fallbacks": 0, "cached": 0, "decoded_bytes": 0}
+
+    @property
+    def renders_in_browser(self):
+        """True when a page that is not ready over HTTP gets rendered in the browser."""
+        return self.mode in ("auto", "browser") and self.drivers is not None
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def fetch_http(self, url):
+        with self._slots:
+            response = self.session.get(url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        self._count("http")
+        self._count("decoded_bytes", len(response.content))
+        return response.text
+
+    def fetch_browser(self, url, ready=None, settle=0):
+        if self.drivers is None:
+            raise RuntimeError(f"No browser available to render {url}")
+        with self.drivers.driver() as driver:
+            driver.get(url)
+            if hasattr(ready, "wait"):
+                ready.wait(driver)
+            else:
+                time.sleep(settle)
+            html = driver.page_source
+        self._count("browser")
+        self._count("decoded_bytes", len(html.encode("utf-8")))
+        return html
+
+    def fetch(self, url, ready=None, settle=0):
+        """
+        Return the HTML for `url`.
+
+        Parameters:
+            url (str): Page to fetch.
+            ready (callable): Predicate on the HTML; a page failing it over plain HTTP
+                              is re-rendered in the browser (in 'auto' mode). A
+                              page_readiness.SiteReadiness also drives the browser wait.
+            settle (float): Seconds to wait after a browser navigation when `ready`
+                            has no browser wait of its own.
+        """
+        if self.mode == "replay":
+            html = self.cache.latest(url)
+            self._count("cached")
+            return html
+
+        if self.cache is not None:
+            html = self.cache.get(url)
+            if html is not None and (ready is None or ready(html)):
+                self._count("cached")
+                return html
+
+        html = self._fetch_live(url, ready, settle)
+        if self.cache is not None and html is not None and (ready is None or ready(html)):
+            self.cache.put(url, html)
+        return html
+
+    def _fetch_live(self, url, ready, settle):
+        if self.mode == "browser":
+            return self.fetch_browser(url, ready, settle)
+
+        try:
+            html = self.fetch_http(url)
+        except requests.RequestException as e:
+            if self.mode == "http" or self.drivers is None:
+                raise
+            print(f"HTTP fetch failed for {url} ({e}), falling back to browser.")
+            html = None
+
+        if html is not None and (ready is None or ready(html)):
+            return html
+        if self.mode == "http" or self.drivers is None:
+            return html
+
+        self._count("fallbacks")
+        print(f"Page not ready over HTTP, rendering in browser: {url}")
+        return self.fetch_browser(url, ready, settle)
+
+    def map(self, fn, items):
+        """
+        Run `fn(item)` for every item with up to `pool_size` in flight, returning
+        results in the order of `items`.
+        """
+        items = list(items)
+        if self.pool_size == 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            return list(executor.map(fn, items))
+
+    def close(self):
+        print(
+            f"Fetched {self.stats['http']} page(s) over HTTP and {self.stats['browser']} in the browser "
+            f"({self.stats['fallbacks']} fallback(s)); {self.stats['cached']} served from cache. "
+            f"{self.stats['decoded_bytes'] / 1024 / 1024:.1f} MB of decoded HTML."
+        )
+        if self.stats["browser"]:
+            tracker = get_latency_tracker()
+            for line in tracker.summary():
+                print(f"Page load latency - {line}")
+            tracker.save()
+        if self.cache is not None:
+            self.cache.flush()
+        self.session.close()
+        if self.drivers is not None:
+            self.drivers.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,67 +1,458 @@
 from dotenv import load_dotenv
 import os
+import json
+import re
 from openai import OpenAI
 import pandas as pd
 import openai
 import backoff
 import time
+import threading
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from rate_limit import RateLimiter
+from call_metrics import CallMetrics
+from description_cache import DescriptionCache, prompt_fingerprint
+from description_journal import DescriptionJournal, game_id
+from near_duplicates import NearDuplicateIndex
+from description_batch import (
+    batch_state_path, clear_pending_batch, load_pending_batch, poll_batch, read_batch_results, submit_batch
+)
 load_dotenv() 
 client = OpenAI()
 
+MODEL = "gpt-4o-mini"
+# Requests in flight at once per generate_descriptions call
+MAX_WORKERS = int(os.getenv("OPENAI_MAX_WORKERS", "8"))
+# Completion tokens reserved per request until the real usage is known
+COMPLETION_TOKEN_ESTIMATE = 100
+LEAGUE = "MLB"
+PLACEHOLDER_DESCRIPTION = "Description unavailable"
+# Descriptions kept per prompt; games sharing a promo and time rotate through them
+DESCRIPTION_VARIANTS = int(os.getenv("DESCRIPTION_VARIANTS", "3"))
+# Games per request; 1 keeps the one-prompt-per-game mode
+BATCH_SIZE = int(os.getenv("DESCRIPTION_BATCH_SIZE", "1"))
+# "online" calls the model directly; "offline" submits one batch job and merges its results
+DESCRIPTION_MODE_ENV = "DESCRIPTION_MODE"
+DESCRIPTION_MODES = ("online", "offline")
+# Batched requests per game before it falls back to its own single-game prompt
+BATCH_ATTEMPTS = 2
+# Opening every description shares; left out when comparing descriptions
+DESCRIPTION_PREFIX = "MLB: xxx tickets available for the game."
+# Estimated similarity at which a new description counts as a near-duplicate of an earlier one
+DUPLICATE_THRESHOLD = float(os.getenv("DESCRIPTION_DUPLICATE_THRESHOLD", "0.8"))
+# Extra attempts for a game whose description came back as a near-duplicate
+DUPLICATE_RETRIES = 2
 
-
-def generate_descriptions(game_df):
-    previous_descriptions = deque(maxlen=10)  # adjust window as needed
-
-
-    # Exponential backoff to handle rate limits
-    @backoff.on_exception(backoff.expo, openai.RateLimitError, max_time=60, max_tries=6)
-    def completions_with_backoff(**kwargs):
-        return client.chat.completions.create(**kwargs)
-
-    # Define a function to generate descriptions using GPT-4o-mini
-    def chat_generate_description(row):
-        print(f"Processing row index: {row.name}")   
-        recent_examples = "\n".join(f"- {desc}" for desc in previous_descriptions)
-        context = f"""
-        You are generating descriptions for tickets that have been donated.
-        Avoid repeating common words and phrases in these recent descriptions:
-        {recent_examples if recent_examples else '- None yet!'}
-        """
-
-        prompt = f"""
-        Generate a short description. It should exactly word for word begin with --- MLB: xxx tickets available for the game. LEAVE THE xxx IN!
+DESCRIPTION_RULES = """
         Then write a short and sweet description and dont be cringy. That doesn't mention family and friends. Do not mention exact time.
         Limit it to 1 short sentence!
         If there is a promo available please write a kid friendly description for it within that 1 sentence. Do not refer to anything as 'our events' or 'our tickets'. It is 'the tickets' or 'the event'
         Do not refer to promo sponsors in your description
         Do not refer to "your purchase" or anything along those lines.
         If its a light hearted event, include a pun
+"""
+
+# Shared by every call so concurrent callers stay within one account budget
+rate_limiter = RateLimiter(
+    requests_per_minute=int(os.getenv("OPENAI_RPM", "500")),
+    tokens_per_minute=int(os.getenv("OPENAI_TPM", "200000"))
+)
+# Every model call of the run; written out with report_description_metrics
+call_metrics = CallMetrics(MODEL)
+# Retries, backoff and rate-limiter waits of the call in progress on this thread
+_current_call = threading.local()
+
+
+def estimate_tokens(text):
+    # Roughly 4 characters per token for English prompts
+    return len(text) // 4 + 1
+
+
+def _record_backoff(details):
+    _current_call.retries += 1
+    _current_call.backoff += details["wait"]
+
+
+def report_description_metrics(path):
+    """Print the run's model call summary and save it as JSON to `path`."""
+    for line in call_metrics.summary_lines():
+        print(f"Descriptions: {line}")
+    call_metrics.write_report(path)
+
+
+_description_cache = None
+_description_cache_lock = threading.Lock()
 
-        - **Promo:** {row['Promo'] if pd.notna(row['Promo']) else 'No promo available'}
+
+def get_description_cache():
+    """Shared description cache, stored in $DESCRIPTION_CACHE_PATH."""
+    global _description_cache
+    with _description_cache_lock:
+        if _description_cache is None:
+            _description_cache = DescriptionCache(max_variants=DESCRIPTION_VARIANTS)
+        return _description_cache
+
+
+_description_journal = None
+
+
+def get_description_journal():
+    """Description journal loaded once per run, stored in $DESCRIPTION_JOURNAL_PATH."""
+    global _description_journal
+    with _description_cache_lock:
+        if _description_journal is None:
+            _description_journal = DescriptionJournal()
+        return _description_journal
+
+
+_duplicate_index = None
+
+
+def get_duplicate_index():
+    """Near-duplicate index shared by every generate_descriptions call in this run."""
+    global _duplicate_index
+    with _description_cache_lock:
+        if _duplicate_index is None:
+            _duplicate_index = NearDuplicateIndex(threshold=DUPLICATE_THRESHOLD, ignore_prefix=DESCRIPTION_PREFIX)
+        return _duplicate_index
+
+
+def resolve_description_mode(mode=None):
+    """Description mode: explicit value, then $DESCRIPTION_MODE, then 'online'."""
+    mode = mode or os.getenv(DESCRIPTION_MODE_ENV) or "online"
+    if mode not in DESCRIPTION_MODES:
+        raise ValueError(f"Unknown description mode '{mode}': must be one of {', '.join(DESCRIPTION_MODES)}")
+    return mode
+
+
+def descriptions_complete(df):
+    """True when no game in `df` fell back to the placeholder description."""
+    return not (df["Description"] == PLACEHOLDER_DESCRIPTION).any()
+
+
+def promo_text(row):
+    return row['Promo'] if pd.notna(row['Promo']) else 'No promo available'
+
+
+def parse_batch_response(content):
+    """
+    Pull {id: description} out of a batched response.
+
+    Accepts a JSON array of {"id", "description"} objects, or an object wrapping
+    one, and tolerates surrounding text; entries without a usable id or text are
+    skipped so the caller can retry just those games.
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        match = re.search(r"\[.*\]", content or "", re.DOTALL)
+        try:
+            data = json.loads(match.group(0)) if match else []
+        except ValueError:
+            data = []
+    if isinstance(data, dict):
+        data = next((value for value in data.values() if isinstance(value, list)), [])
+
+    descriptions = {}
+    for entry in data if isinstance(data, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        description = entry.get("description")
+        try:
+            game_id = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if isinstance(description, str) and description.strip():
+            descriptions[game_id] = description.strip()
+    return descriptions
+
+
+def build_prompt(row):
+    return f"""
+        Generate a short description. It should exactly word for word begin with --- MLB: xxx tickets available for the game. LEAVE THE xxx IN!{DESCRIPTION_RULES}
+        - **Promo:** {promo_text(row)}
         - **Time:** {row['Game Time']}
         
         """
 
+
+def description_key(row):
+    """Fingerprint of everything that goes into a row's prompt."""
+    return prompt_fingerprint(MODEL, LEAGUE, row['Promo'], row['Game Time'])
+
+
+def generate_descriptions(game_df, max_workers=None, batch_size=None, mode=None, wait=True):
+    """
+    Add a 'Description' column generated by the model for every game.
+
+    Rows are grouped by prompt fingerprint (promo and game time) first, so only
+    unique prompts reach the model: each prompt gets up to $DESCRIPTION_VARIANTS
+    descriptions, reused from the persistent description cache where possible, and
+    the rows sharing it take turns with them. Requests are sent concurrently (up to
+    `max_workers`, default $OPENAI_MAX_WORKERS) while the shared rate limiter keeps
+    requests and tokens per minute within $OPENAI_RPM / $OPENAI_TPM. Descriptions
+    are written back in row order.
+
+    With `batch_size` (default $DESCRIPTION_BATCH_SIZE) above 1, up to that many
+    games share one request and the model answers with a JSON array keyed by game
+    id; games missing from a malformed or partial answer are re-sent in a smaller
+    batch, then on their own. Tokens per description and descriptions per minute
+    are reported so the two modes can be compared.
+
+    With `mode` "offline" (default $DESCRIPTION_MODE) the prompts the cache is
+    missing are submitted as one batch job instead, recorded in
+    $DESCRIPTION_BATCH_STATE, polled and merged back by prompt fingerprint. A run
+    that finds a pending batch resumes it rather than submitting again; with
+    `wait=False` it checks once and raises BatchPending if the job is unfinished.
+
+    Prompts are independent of each other. Instead of showing the model earlier
+    output, each new description is checked against every description of the
+    run in a MinHash/LSH index. Near-duplicates (estimated similarity of at least
+    $DESCRIPTION_DUPLICATE_THRESHOLD) are regenerated, up to DUPLICATE_RETRIES
+    times; offline batch results are only counted.
+
+    Every finished description is appended to the journal in
+    $DESCRIPTION_JOURNAL_PATH under the game's stable id as soon as it arrives.
+    Games already journaled with the same prompt are skipped, so a rerun after a
+    crash or an outage only pays for the rest; failed games are never journaled
+    and are retried.
+    """
+    usage = {"requests": 0, "tokens": 0, "prompt_tokens": 0, "near_duplicates": 0}
+    usage_lock = threading.Lock()
+
+
+    # Exponential backoff to handle rate limits; every attempt draws from the rate limiter
+    @backoff.on_exception(backoff.expo, openai.RateLimitError, max_time=60, max_tries=6,
+                          on_backoff=_record_backoff)
+    def completions_with_backoff(reserved_tokens, **kwargs):
+        _current_call.rate_limit_wait += rate_limiter.acquire(reserved_tokens)
+        return client.chat.completions.create(**kwargs)
+
+    def request_completion(prompt, completion_tokens, **kwargs):
+        reserved_tokens = estimate_tokens(prompt) + completion_tokens
+        _current_call.retries = 0
+        _current_call.backoff = 0.0
+        _current_call.rate_limit_wait = 0.0
+        started = time.monotonic()
         try:
             response = completions_with_backoff(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}]
+                reserved_tokens,
+                model=MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                **kwargs
+            )
+        except Exception:
+            call_metrics.record(
+                latency=time.monotonic() - started, retries=_current_call.retries,
+                backoff=_current_call.backoff, rate_limit_wait=_current_call.rate_limit_wait, ok=False
             )
+            raise
+        response_usage = getattr(response, "usage", None)
+        call_metrics.record(
+            latency=time.monotonic() - started, retries=_current_call.retries,
+            backoff=_current_call.backoff, rate_limit_wait=_current_call.rate_limit_wait,
+            prompt_tokens=response_usage.prompt_tokens if response_usage else 0,
+            completion_tokens=response_usage.completion_tokens if response_usage else 0
+        )
+        with usage_lock:
+            usage["requests"] += 1
+        if response_usage is not None:
+            rate_limiter.settle(reserved_tokens, response_usage.total_tokens)
+            with usage_lock:
+                usage["tokens"] += response_usage.total_tokens
+                usage["prompt_tokens"] += response_usage.prompt_tokens
+        return response.choices[0].message.content
 
-            description = response.choices[0].message.content.strip()
-            previous_descriptions.append(description)
-            return description
+    # Define a function to generate descriptions using GPT-4o-mini
+    def chat_generate_description(row):
+        print(f"Processing row index: {row.name}")   
+        try:
+            return request_completion(build_prompt(row), COMPLETION_TOKEN_ESTIMATE).strip()
         
         except Exception as e:
             print(f"Error for game {row['Home Team']} vs {row['Away Team']}: {e}")
-            return "Description unavailable"
+            return PLACEHOLDER_DESCRIPTION
+
+    def chat_generate_batch(games):
+        # games: [(game id, row)]; returns {game id: description} for the ids answered
+        listing = "\n".join(
+            f"        - **Game {game_id}:** Promo: {promo_text(row)} | Time: {row['Game Time']}"
+            for game_id, row in games
+        )
+        prompt = f"""
+        Generate a short description for each game below. Each one should exactly word for word begin with --- MLB: xxx tickets available for the game. LEAVE THE xxx IN!{DESCRIPTION_RULES}
+        Vary the wording between games.
+        Answer in JSON only: {{"descriptions": [{{"id": <game number>, "description": "<description>"}}, ...]}} with one entry per game.
+
+{listing}
+        """
+        try:
+            content = request_completion(
+                prompt,
+                COMPLETION_TOKEN_ESTIMATE * len(games),
+                response_format={"type": "json_object"}
+            )
+        except Exception as e:
+            print(f"Error for batch of {len(games)} game(s): {e}")
+            return {}
+        requested = {game_id for game_id, _ in games}
+        return {game_id: text for game_id, text in parse_batch_response(content).items() if game_id in requested}
+
+    # Games finished by an earlier run are taken from the journal as they are
+    cache = get_description_cache()
+    journal = get_description_journal()
+    rows = [row for _, row in game_df.iterrows()]
+    keys = [description_key(row) for row in rows]
+    game_ids = [game_id(row) for row in rows]
+    descriptions = [None] * len(rows)
+    for position, key in enumerate(keys):
+        journaled = journal.get(game_ids[position], key)
+        if journaled is not None:
+            descriptions[position] = journaled
+            cache.add(key, journaled)
+    journaled_rows = sum(description is not None for description in descriptions)
+    duplicates = get_duplicate_index()
+    for description in descriptions:
+        if description is not None:
+            duplicates.add(description)
+    for key in set(keys):
+        for variant in cache.variants(key):
+            duplicates.add(variant)
 
-    # Apply the function to each row while handling rate limits
-    game_df["Description"] = game_df.apply(chat_generate_description, axis=1)
+    # Collapse duplicate prompts and request only the variants the cache is missing
+    groups = {}
+    for position, key in enumerate(keys):
+        if descriptions[position] is None:
+            groups.setdefault(key, []).append(position)
+    unassigned = {key: deque(positions) for key, positions in groups.items()}
+    assign_lock = threading.Lock()
+
+    def store(key, description, force=False):
+        # Cache the new variant and journal it straight away for the next game waiting on it;
+        # a near-duplicate is turned away (returns False) unless `force` is set
+        if duplicates.add_if_unique(description) is not None:
+            with usage_lock:
+                usage["near_duplicates"] += 1
+            if not force:
+                return False
+        cache.add(key, description)
+        with assign_lock:
+            position = unassigned[key].popleft() if unassigned.get(key) else None
+            if position is not None:
+                descriptions[position] = description
+        if position is not None:
+            journal.record(game_ids[position], key, description)
+        return True
+
+    def missing_variants():
+        calls = []
+        for key, positions in groups.items():
+            missing = min(len(positions), cache.max_variants) - len(cache.variants(key))
+            calls.extend([(key, rows[positions[0]])] * max(0, missing))
+        return calls
+
+    calls = missing_variants()
+
+    def generate_variant(request):
+        key, row = request
+        for attempt in range(DUPLICATE_RETRIES + 1):
+            description = chat_generate_description(row)
+            if description == PLACEHOLDER_DESCRIPTION:
+                return
+            if store(key, description, force=attempt == DUPLICATE_RETRIES):
+                return
+
+    def generate_batch(batch):
+        # batch: [(game id, key, row)]; only games missing from the answer are re-sent
+        pending = batch
+        for _ in range(BATCH_ATTEMPTS):
+            answered = chat_generate_batch([(game_id, row) for game_id, _, row in pending])
+            accepted = {
+                game_id for game_id, key, _ in pending
+                if game_id in answered and store(key, answered[game_id])
+            }
+            pending = [game for game in pending if game[0] not in accepted]
+            if not pending:
+                return
+        print(f"{len(pending)} game(s) missing or duplicated in batched responses, requesting them one by one.")
+        for _, key, row in pending:
+            generate_variant((key, row))
+
+    def generate_offline(calls):
+        state_path = batch_state_path()
+        # A batch left by an earlier run is merged first; whatever it did not cover is submitted next
+        for _ in range(2):
+            state = load_pending_batch(state_path)
+            resumed = state is not None
+            if resumed:
+                print(f"🔧 Resuming description batch {state['batch_id']}.")
+            elif calls:
+                state = submit_batch(
+                    client,
+                    [(f"{key}-{n}", {"model": MODEL, "messages": [{"role": "user", "content": build_prompt(row)}]})
+                     for n, (key, row) in enumerate(calls)],
+                    state_path
+                )
+            else:
+                return
+            batch = poll_batch(client, state["batch_id"], wait=wait)
+            results = read_batch_results(client, batch)
+            for custom_id, (content, result_usage) in results.items():
+                call_metrics.record(
+                    prompt_tokens=result_usage.get("prompt_tokens", 0),
+                    completion_tokens=result_usage.get("completion_tokens", 0),
+                    batch=True
+                )
+                store(custom_id.rsplit("-", 1)[0], content.strip(), force=True)
+            cache.save()
+            clear_pending_batch(state_path)
+            print(f"✅ Merged {len(results)}/{state['requests']} description(s) from batch {state['batch_id']}.")
+            calls = missing_variants()
+            if not resumed:
+                return
+
+    mode = resolve_description_mode(mode)
+    batch_size = batch_size or BATCH_SIZE
+    started = time.monotonic()
+    if mode == "offline":
+        generate_offline(calls)
+    elif calls:
+        with ThreadPoolExecutor(max_workers=max_workers or MAX_WORKERS) as executor:
+            if batch_size > 1:
+                games = [(game_id, key, row) for game_id, (key, row) in enumerate(calls)]
+                batches = [games[i:i + batch_size] for i in range(0, len(games), batch_size)]
+                list(executor.map(generate_batch, batches))
+            else:
+                list(executor.map(generate_variant, calls))
+        cache.save()
+    elapsed = time.monotonic() - started
+    via = "a batch job" if mode == "offline" else f"{usage['requests']} request(s) (batch size {batch_size})"
+    print(
+        f"Descriptions: {len(rows)} row(s), {journaled_rows} from the journal, "
+        f"{len(groups)} unique prompt(s), {len(calls)} generated via {via}, "
+        f"{usage['near_duplicates']} near-duplicate(s) flagged."
+    )
+    if calls and usage["requests"]:
+        print(
+            f"Descriptions: {usage['tokens'] / len(calls):.0f} tokens/description "
+            f"({usage['prompt_tokens'] / usage['requests']:.0f} input tokens/request), "
+            f"{len(calls) / max(elapsed, 1e-9) * 60:.0f} descriptions/min."
+        )
+
+    # Remaining rows sharing a prompt rotate through its variants, in row order
+    reused = []
+    for key, positions in unassigned.items():
+        variants = cache.variants(key)
+        for n, position in enumerate(positions):
+            if variants:
+                descriptions[position] = variants[n % len(variants)]
+                reused.append((game_ids[position], key, descriptions[position]))
+            else:
+                descriptions[position] = PLACEHOLDER_DESCRIPTION
+    journal.record_many(reused)
+    game_df["Description"] = descriptions
 
     # Save the updated DataFrame
     return game_df
 
-
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from generate_descriptions import PLACEHOLDER_DESCRIPTION
+
+# Scraped fields that identify a game; anything downstream is derived from these.
+SOURCE_COLUMNS = ["Home Team", "Away Team", "Game Date", "Day", "Game Time", "Promo"]
+
+
+def _hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def row_fingerprints(df, columns=SOURCE_COLUMNS):
+    """Fingerprint each row from its scraped source fields."""
+    columns = [col for col in columns if col in df.columns]
+    values = df[columns].astype(object).where(df[columns].notna(), None)
+    return [_hash(row) for row in values.itertuples(index=False, name=None)]
+
+
+def _json_records(df):
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def load_refresh_state(state_path):
+    """Load the previous run's per-page fingerprints and processed rows, if any."""
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"pages": {}}
+
+
+def import_refresh_state(store, state_path):
+    """Copy a JSON refresh state from before the schedule store into an empty store."""
+    if store.refresh_pages() or not os.path.exists(state_path):
+        return
+    pages = load_refresh_state(state_path).get("pages", {})
+    store.save_refresh_pages(
+        {
+            page: (entry["fingerprint"], [(row["fingerprint"], row["row"]) for row in entry.get("rows", [])])
+            for page, entry in pages.items()
+        },
+        keep=set(pages)
+    )
+    print(f"Imported refresh state for {len(pages)} page(s) from {state_path}")
+
+
+def refresh_incrementally(schedule_df, store, process, page_column="Home Team", legacy_state_path=None):
+    """
+    Run `process` (venue join, descriptions, ...) only on rows whose source changed
+    since the previous run, reusing the previous run's processed rows for the rest.
+
+    Reuse is per row: every page is still fetched and parsed, each row is
+    fingerprinted from its scraped source fields, and a row whose fingerprint
+    was processed before gets the saved result; only new fingerprints are
+    processed. Rows that previously came back as "Description unavailable" are
+    always retried. Previous rows are looked up by fingerprint in `store`, so
+    only the rows of this schedule are loaded.
+
+    Rows are also grouped into pages by `page_column` (each MLB team page holds
+    that team's home games). The page fingerprints only decide which pages'
+    saved rows are written back (pages that changed or had a row retried) and
+    are reported in the progress line.
+
+    Parameters:
+        schedule_df (pd.DataFrame): Freshly scraped schedule.
+        store (ScheduleStore): Holds the previous run's fingerprints and rows (see schedule_store).
+        process (callable): DataFrame -> DataFrame, returning one row per input row in order.
+        page_column (str): Column identifying the source page of each row.
+        legacy_state_path (str): JSON state file of older runs, imported once into an empty store.
+
+    Returns:
+        pd.DataFrame: Processed rows for the whole schedule, in `schedule_df` order.
+    """
+    schedule_df = schedule_df.reset_index(drop=True)
+    if legacy_state_path:
+        import_refresh_state(store, legacy_state_path)
+    previous_pages = store.refresh_pages()
+    fingerprints = row_fingerprints(schedule_df)
+    previous_rows = {
+        fp: row for fp, row in store.refresh_rows(fingerprints).items()
+        if row.get("Description") != PLACEHOLDER_DESCRIPTION
+    }
+
+    pages = {}
+    changed_pages = set()
+    for page, positions in schedule_df.groupby(page_column, sort=False).indices.items():
+        page_fps = [fingerprints[i] for i in positions]
+        page_fp = _hash(page_fps)
+        pages[str(page)] = (page_fp, positions)
+        if previous_pages.get(str(page)) != page_fp:
+            changed_pages.add(str(page))
+
+    rows = [previous_rows.get(fp) for fp in fingerprints]
+    stale = [i for i, row in enumerate(rows) if row is None]
+    print(
+        f"Incremental refresh: {len(changed_pages)}/{len(pages)} page(s) changed, "
+        f"{len(stale)}/{len(rows)} row(s) to process."
+    )
+
+    columns = None
+    if stale:
+        processed = process(schedule_df.iloc[stale].reset_index(drop=True))
+        columns = list(processed.columns)
+        for i, record in zip(stale, _json_records(processed)):
+            rows[i] = record
+
+    if not rows:
+        return process(schedule_df)
+    if columns is None:
+        columns = list(rows[0].keys())
+    result = pd.DataFrame(rows, columns=columns)
+
+    # Pages with a retried row are rewritten too, even if their source did not change
+    changed_pages.update(str(schedule_df.at[i, page_column]) for i in stale)
+    store.save_refresh_pages(
+        {
+            page: (page_fp, [(fingerprints[i], rows[i]) for i in positions])
+            for page, (page_fp, positions) in pages.items()
+            if page in changed_pages
+        },
+        keep=set(pages)
+    )
+    return result
@@ -1,17 +1,61 @@
 # inside your Docker image (e.g. entrypoint)
-import sys
+import argparse
 from mlb_scraper import main as mlb_extract
 from nba_scraper import main as nba_extract
 from wnba_scraper import main as wnba_extract
 from nhl_scraper import main as nhl_extract
 
 if __name__ == "__main__":
-    league = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Scrape a league schedule into Dynamics exports.")
+    parser.add_argument("league", choices=["nba", "wnba", "nhl", "mlb"])
+    parser.add_argument(
+        "--pool-size", type=int, default=None,
+        help="Number of concurrent fetches and browser sessions; ESPN leagues split their "
+             "date range into this many shards (default: $SCRAPER_POOL_SIZE or 1)"
+    )
+    parser.add_argument(
+        "--fetch-mode", choices=["auto", "http", "browser", "replay"], default=None,
+        help="Fetch pages over plain HTTP, in the browser, HTTP with browser fallback, "
+             "or replay them from the page cache (default: $SCRAPER_FETCH_MODE or auto)"
+    )
+    parser.add_argument(
+        "--replay", action="store_const", const="replay", dest="fetch_mode",
+        help="Shorthand for --fetch-mode replay: run entirely from cached pages"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="MLB only: re-describe only games that changed since the previous run"
+    )
+    parser.add_argument(
+        "--mlb-schedule", choices=["fullseason", "home"], default=None,
+        help="MLB only: fetch full-season team pages or home games only "
+             "(default: $SCRAPER_MLB_SCHEDULE or fullseason)"
+    )
+    parser.add_argument(
+        "--describe-mode", choices=["online", "offline"], default=None,
+        help="MLB only: call the model directly, or submit descriptions as one batch job "
+             "and merge the results (default: $DESCRIPTION_MODE or online)"
+    )
+    parser.add_argument(
+        "--no-wait", action="store_false", dest="wait",
+        help="MLB only, with --describe-mode offline: submit or check the batch once and exit "
+             "if it is still running; rerun to resume it"
+    )
+    args = parser.parse_args()
+
+    league = args.league
     if league == "nba":
-        nba_extract()
+        nba_extract(fetch_mode=args.fetch_mode, pool_size=args.pool_size)
     elif league == "wnba":
-        wnba_extract()
+        wnba_extract(fetch_mode=args.fetch_mode, pool_size=args.pool_size)
     elif league == "nhl":
-        nhl_extract()
+        nhl_extract(fetch_mode=args.fetch_mode, pool_size=args.pool_size)
     elif league == "mlb":
-        mlb_extract()
+        mlb_extract(
+            pool_size=args.pool_size,
+            fetch_mode=args.fetch_mode,
+            incremental=args.incremental,
+            schedule_mode=args.mlb_schedule,
+            describe_mode=args.describe_mode,
+            wait=args.wait
+        )
@@ -1,37 +1,49 @@
-import pandas as pd
 from scrape_schedules import scrape_team_schedules
 from scrape_venues import join_schedule_with_venues
-from generate_descriptions import generate_descriptions
+from generate_descriptions import generate_descriptions, report_description_metrics
+from description_batch import BatchPending
 from add_necassary_columns import finalize_game_info_df
+from incremental import refresh_incrementally
+from schedule_store import ScheduleStore
 
-from save_sep_files import generate_team_sheets_from_schedule
+from save_sep_files import export_teams
 
 
-def main():
-    schedule_df = scrape_team_schedules()
-    combined_df = join_schedule_with_venues(schedule_df)
-    description_df = generate_descriptions(combined_df)
-    final_df = finalize_game_info_df(description_df)
-
-    # Step 1: Save one Excel file with all teams as separate sheets
-    by_team_path = "/app/static/mlb_final_draft_by_team.xlsx"
-    with pd.ExcelWriter(by_team_path, engine="openpyxl") as writer:
-        teams = final_df["Name"].str.extract(r'^(.*?) vs')[0].dropna().unique()
-        for team in teams:
-            team_df = final_df[final_df["Name"].str.startswith(team)]
-            safe_name = team[:31]
-            team_df.to_excel(writer, sheet_name=safe_name, index=False)
-    print(f"✅ Multi-sheet schedule saved to: {by_team_path}")
-
-    # Step 2: Generate Dynamics-ready Excel file per team
-    template_path = "/app/data/dynamics_submission.xlsx"
-    output_dir = "/app/static/dynamics_team_exports"
-    generate_team_sheets_from_schedule(
-        xlsx_path=by_team_path,
-        template_path=template_path,
-        output_dir=output_dir
-    )
+def main(pool_size=None, fetch_mode=None, incremental=False, schedule_mode=None, describe_mode=None, wait=True):
+    schedule_df = scrape_team_schedules(pool_size=pool_size, fetch_mode=fetch_mode, schedule_mode=schedule_mode)
+    with ScheduleStore() as store:
+        try:
+            if incremental:
+                # Only games whose scraped fields changed since the last run are re-joined and re-described
+                description_df = refresh_incrementally(
+                    schedule_df,
+                    store=store,
+                    process=lambda df: generate_descriptions(join_schedule_with_venues(df), mode=describe_mode, wait=wait),
+                    legacy_state_path="/app/static/mlb_refresh_state.json"
+                )
+            else:
+                combined_df = join_schedule_with_venues(schedule_df)
+                description_df = generate_descriptions(combined_df, mode=describe_mode, wait=wait)
+        except BatchPending as pending:
+            # An offline description batch is still running; the next run resumes it
+            print(f"⏳ {pending}; rerun to merge its descriptions and export.")
+            return
+        finally:
+            report_description_metrics("/app/static/description_metrics.json")
+        final_df = finalize_game_info_df(description_df)
 
+        # The store keeps every season; the export reads back only the seasons this scrape touched.
+        # Multi-sheet workbook plus one Dynamics-style file per team; only teams whose games
+        # changed since the last export are rewritten, and the changes go to the delta file
+        counts = store.upsert_games("MLB", final_df)
+        export_teams(
+            store.games("MLB", seasons=counts["seasons"]),
+            by_team_path="/app/static/mlb_final_draft_by_team.xlsx",
+            template_path="/app/data/dynamics_submission.xlsx",
+            output_dir="/app/static/dynamics_team_exports",
+            manifest_path="/app/static/mlb_export_manifest.json",
+            delta_path="/app/static/mlb_delta.csv"
+        )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+import hashlib
+import random
+import threading
+
+import numpy as np
+
+# Mersenne prime for the MinHash permutations; with a, b and h below it, a * h + b fits in 64 bits
+_PRIME = (1 << 31) - 1
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index for spotting near-duplicate descriptions.
+
+    Texts are broken into character shingles and reduced to a MinHash signature.
+    The signature is split into bands, and texts sharing any band become
+    candidates. A candidate counts as a near-duplicate when the estimated
+    Jaccard similarity reaches `threshold`, so a lookup only compares against a
+    handful of texts instead of all of them. Thread-safe.
+
+    Parameters:
+        threshold (float): Estimated Jaccard similarity at which two texts are near-duplicates.
+        num_perm (int): MinHash permutations, split evenly into `bands`.
+        bands (int): LSH bands; more bands find lower-similarity candidates.
+        shingle_size (int): Characters per shingle.
+        ignore_prefix (str): Boilerplate opening that every text shares, left out of the comparison.
+    """
+
+    def __init__(self, threshold=0.7, num_perm=64, bands=16, shingle_size=5, ignore_prefix=""):
+        rng = random.Random(0)
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.ignore_prefix = ignore_prefix.lower()
+        self._a = np.array([rng.randrange(1, _PRIME) for _ in range(num_perm)], dtype=np.uint64)
+        self._b = np.array([rng.randrange(0, _PRIME) for _ in range(num_perm)], dtype=np.uint64)
+        self._rows = num_perm // bands
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def _shingles(self, text):
+        text = " ".join(text.lower().split()).lstrip("- ")
+        if self.ignore_prefix and text.startswith(self.ignore_prefix):
+            text = text[len(self.ignore_prefix):].strip()
+        if len(text) <= self.shingle_size:
+            return {text}
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, text):
+        hashes = np.array([
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big") % _PRIME
+            for shingle in self._shingles(text)
+        ], dtype=np.uint64)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % np.uint64(_PRIME)
+        return tuple(permuted.min(axis=1).tolist())
+
+    def _bands(self, signature):
+        for band in range(len(self._buckets)):
+            yield band, signature[band * self._rows:(band + 1) * self._rows]
+
+    def _match(self, signature):
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        best, best_similarity = None, 0.0
+        for candidate in candidates:
+            other = self._signatures[candidate]
+            similarity = sum(x == y for x, y in zip(signature, other)) / len(signature)
+            if similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+        return best if best_similarity >= self.threshold else None
+
+    def _insert(self, text, signature):
+        self._signatures[text] = signature
+        for band, key in self._bands(signature):
+            self._buckets[band].setdefault(key, []).append(text)
+
+    def add(self, text):
+        """Index `text` without checking it (e.g. descriptions accepted by earlier runs)."""
+        signature = self.signature(text)
+        with self._lock:
+            if text not in self._signatures:
+                self._insert(text, signature)
+
+    def add_if_unique(self, text):
+        """
+        Index `text` unless it nearly duplicates an indexed text.
+
+        Returns:
+            str or None: The indexed text it duplicates, or None if it was added.
+        """
+        signature = self.signature(text)
+        with self._lock:
+            if text in self._signatures:
+                return text
+            match = self._match(signature)
+            if match is None:
+                self._insert(text, signature)
+            return match
@@ -0,0 +1,201 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date
+
+CACHE_DIR_ENV = "SCRAPER_CACHE_DIR"
+CACHE_TTL_ENV = "SCRAPER_CACHE_TTL_HOURS"
+CACHE_MAX_MB_ENV = "SCRAPER_CACHE_MAX_MB"
+CACHE_COMPRESS_ENV = "SCRAPER_CACHE_COMPRESS"
+
+DEFAULT_CACHE_DIR = "/app/static/page_cache"
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_MB = 500
+
+
+class CacheMiss(KeyError):
+    """Raised in replay mode when a page was never cached."""
+
+
+class PageCache:
+    """
+    On-disk cache of fetched HTML, keyed by URL plus fetch date.
+
+    Each page is stored under the SHA-256 of its key, optionally gzip-compressed.
+    An index tracks size and last access so the cache is held under `max_bytes`
+    by evicting the least recently used pages. Entries older than `ttl_hours`
+    are not served to live fetches, but replay (`latest`) serves the newest copy
+    of a page regardless of age; older expired copies are deleted on load.
+
+    Parameters:
+        root (str): Cache directory.
+        ttl_hours (float): How long a cached page is served to live fetches.
+        max_bytes (int): Size bound for the stored pages.
+        compress (bool): Store pages gzip-compressed.
+    """
+
+    def __init__(self, root, ttl_hours=DEFAULT_TTL_HOURS, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, compress=True):
+        self.root = root
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(root, "index.json")
+        self._dirty = False
+        os.makedirs(root, exist_ok=True)
+        self._index = self._load_index()
+        self._expire()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache from SCRAPER_CACHE_DIR, SCRAPER_CACHE_TTL_HOURS,
+        SCRAPER_CACHE_MAX_MB and SCRAPER_CACHE_COMPRESS. Returns None when
+        caching is disabled with a TTL of 0.
+        """
+        ttl_hours = float(os.getenv(CACHE_TTL_ENV, DEFAULT_TTL_HOURS))
+        if ttl_hours <= 0:
+            return None
+        return cls(
+            root=os.getenv(CACHE_DIR_ENV, DEFAULT_CACHE_DIR),
+            ttl_hours=ttl_hours,
+            max_bytes=int(float(os.getenv(CACHE_MAX_MB_ENV, DEFAULT_MAX_MB)) * 1024 * 1024),
+            compress=os.getenv(CACHE_COMPRESS_ENV, "1") != "0"
+        )
+
+    @staticmethod
+    def key(url, fetch_date=None):
+        fetch_date = fetch_date or date.today().isoformat()
+        return hashlib.sha256(f"{url}\n{fetch_date}".encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+        self._dirty = False
+
+    def _read(self, key, entry):
+        path = os.path.join(self.root, entry["file"])
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self._index.pop(key, None)
+            self._dirty = True
+            return None
+        if entry.get("compressed"):
+            data = gzip.decompress(data)
+        entry["last_access"] = time.time()
+        self._dirty = True
+        return data.decode("utf-8")
+
+    def get(self, url):
+        """Return today's cached HTML for `url` if it is within the TTL, else None."""
+        key = self.key(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or time.time() - entry["fetched_at"] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            html = self._read(key, entry)
+            if html is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return html
+
+    def latest(self, url):
+        """Return the most recently fetched copy of `url`, ignoring the TTL."""
+        with self._lock:
+            candidates = sorted(
+                ((entry["fetched_at"], key, entry) for key, entry in self._index.items() if entry["url"] == url),
+                reverse=True
+            )
+            for _, key, entry in candidates:
+                html = self._read(key, entry)
+                if html is not None:
+                    self.hits += 1
+                    return html
+            self.misses += 1
+        raise CacheMiss(f"No cached copy of {url}")
+
+    def put(self, url, html):
+        key = self.key(url)
+        data = html.encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data)
+        file_name = f"{key}.html.gz" if self.compress else f"{key}.html"
+        path = os.path.join(self.root, file_name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            old = self._index.get(key)
+            if old and old["file"] != file_name:
+                self._remove_file(old["file"])
+            self._index[key] = {
+                "url": url,
+                "date": date.today().isoformat(),
+                "fetched_at": now,
+                "last_access": now,
+                "size": len(data),
+                "file": file_name,
+                "compressed": self.compress,
+            }
+            self._evict()
+            self._save_index()
+
+    def _remove_file(self, file_name):
+        try:
+            os.remove(os.path.join(self.root, file_name))
+        except OSError:
+            pass
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            self._remove_file(entry["file"])
+            total -= entry["size"]
+            del self._index[key]
+
+    def _expire(self):
+        # Drop copies past the TTL unless they are the newest of their URL, which replay still serves
+        newest = {}
+        for key, entry in self._index.items():
+            best = newest.get(entry["url"])
+            if best is None or entry["fetched_at"] > self._index[best]["fetched_at"]:
+                newest[entry["url"]] = key
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            key for key, entry in self._index.items()
+            if entry["fetched_at"] < cutoff and newest[entry["url"]] != key
+        ]
+        for key in expired:
+            self._remove_file(self._index.pop(key)["file"])
+        if expired:
+            self._save_index()
+
+    def flush(self):
+        with self._lock:
+            if self._dirty:
+                self._save_index()
@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from page_cache import CACHE_DIR_ENV, DEFAULT_CACHE_DIR
+
+LATENCY_FILE_ENV = "SCRAPER_LATENCY_FILE"
+POLL_INTERVAL = 0.25
+LATENCY_HISTORY = 50
+# Deadline = observed p95 load latency times this margin, clamped per site.
+TIMEOUT_MARGIN = 1.5
+
+
+class LatencyTracker:
+    """
+    Per-site history of observed page-load latencies, persisted between runs
+    so readiness deadlines start out tuned to how fast each site has been.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self.timeouts = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = {}
+        for site, values in saved.items():
+            self._latencies[site] = deque(values, maxlen=LATENCY_HISTORY)
+
+    def record(self, site, seconds):
+        with self._lock:
+            self._latencies.setdefault(site, deque(maxlen=LATENCY_HISTORY)).append(round(seconds, 3))
+
+    def record_timeout(self, site):
+        with self._lock:
+            self.timeouts[site] = self.timeouts.get(site, 0) + 1
+
+    def percentile(self, site, q):
+        with self._lock:
+            values = sorted(self._latencies.get(site, ()))
+        if not values:
+            return None
+        index = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+        return values[index]
+
+    def summary(self):
+        lines = []
+        for site in sorted(set(self._latencies) | set(self.timeouts)):
+            values = self._latencies.get(site, ())
+            average = sum(values) / len(values) if values else 0
+            lines.append(
+                f"{site}: {len(values)} load(s) recorded, avg {average:.2f}s, "
+                f"p95 {self.percentile(site, 95) or 0:.2f}s, {self.timeouts.get(site, 0)} timeout(s)"
+            )
+        return lines
+
+    def save(self):
+        with self._lock:
+            data = {site: list(values) for site, values in self._latencies.items()}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_latency_tracker():
+    """Shared tracker, stored in $SCRAPER_LATENCY_FILE or the page cache directory."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            path = os.getenv(LATENCY_FILE_ENV) or os.path.join(
+                os.getenv(CACHE_DIR_ENV, DEFAULT_CACHE_DIR), "page_latency.json"
+            )
+            _tracker = LatencyTracker(path)
+        return _tracker
+
+
+class SiteReadiness:
+    """
+    Readiness check for one site's pages, used instead of a fixed sleep.
+
+    Calling the object checks raw HTML (so it can be passed as the `ready`
+    predicate of PageFetcher.fetch). In the browser, `wait(driver)` polls
+    `count_script` until at least `min_count` elements are present (or
+    `empty_script` reports a page with nothing to list) and the count has stopped
+    growing for `settle_polls` polls, or until a deadline derived from this site's
+    recorded load latencies. A timeout is recorded as a load that took the whole
+    deadline, so after slow loads the deadline grows back instead of only shrinking.
+
+    Parameters:
+        site (str): Name the latencies are recorded under.
+        html_check (callable): Predicate on page HTML.
+        count_script (str): JavaScript returning the number of loaded elements.
+        min_count (int): Elements required before the page counts as ready.
+        empty_script (str): JavaScript returning true when the page is loaded but
+                            legitimately empty (e.g. a week without games).
+        settle_polls (int): Consecutive unchanged polls required.
+        min_timeout (float): Lower bound for the adaptive deadline, in seconds.
+        max_timeout (float): Upper bound, also used until latencies have been recorded.
+    """
+
+    def __init__(self, site, html_check, count_script, min_count=1, settle_polls=2,
+                 min_timeout=2.0, max_timeout=20.0, empty_script=None):
+        self.site = site
+        self.html_check = html_check
+        self.count_script = count_script
+        self.min_count = min_count
+        self.empty_script = empty_script
+        self.settle_polls = settle_polls
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+    def __call__(self, html):
+        return self.html_check(html)
+
+    def timeout(self):
+        p95 = get_latency_tracker().percentile(self.site, 95)
+        if p95 is None:
+            return self.max_timeout
+        return min(max(p95 * TIMEOUT_MARGIN, self.min_timeout), self.max_timeout)
+
+    def _is_empty(self, driver):
+        if self.empty_script is None:
+            return False
+        try:
+            return bool(driver.execute_script(self.empty_script))
+        except Exception:
+            return False
+
+    def wait(self, driver):
+        """Poll until the page is ready; returns False if the deadline passed first."""
+        tracker = get_latency_tracker()
+        started = time.monotonic()
+        deadline = started + self.timeout()
+        last_count = None
+        unchanged = 0
+        while True:
+            try:
+                count = driver.execute_script(self.count_script) or 0
+            except Exception as e:
+                print(f"{self.site}: readiness script failed ({e.__class__.__name__}), polling again.")
+                count = 0
+            unchanged = unchanged + 1 if count == last_count else 0
+            last_count = count
+            if unchanged >= self.settle_polls and (count >= self.min_count or self._is_empty(driver)):
+                tracker.record(self.site, time.monotonic() - started)
+                return True
+            if time.monotonic() >= deadline:
+                # The load took at least the whole deadline; recording that keeps p95 from only ever shrinking
+                tracker.record(self.site, deadline - started)
+                tracker.record_timeout(self.site)
+                print(f"{self.site}: page not ready after {deadline - started:.1f}s ({count} element(s)).")
+                return False
+            time.sleep(POLL_INTERVAL)
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a streaming pipeline.
+
+    Parameters:
+        name (str): Label used in progress output.
+        fn (callable): Function or coroutine function applied to each item's payload.
+                       Plain functions run in a worker thread.
+        concurrency (int): Number of items this stage processes at once.
+    """
+
+    def __init__(self, name, fn, concurrency=1):
+        self.name = name
+        self.fn = fn
+        self.concurrency = max(1, concurrency)
+
+    async def apply(self, payload):
+        if asyncio.iscoroutinefunction(self.fn):
+            return await self.fn(payload)
+        return await asyncio.to_thread(self.fn, payload)
+
+
+async def _run_stage(stage, inbox, outbox, downstream_workers):
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            seq, key, payload = item
+            if payload is not None:
+                payload = await stage.apply(payload)
+            await outbox.put((seq, key, payload))
+
+    await asyncio.gather(*(worker() for _ in range(stage.concurrency)))
+    for _ in range(downstream_workers):
+        await outbox.put(_DONE)
+
+
+async def _run_pipeline(items, stages, sink, queue_size):
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    started = time.monotonic()
+
+    async def feed():
+        for seq, item in enumerate(items):
+            await queues[0].put((seq, item, item))
+        for _ in range(stages[0].concurrency):
+            await queues[0].put(_DONE)
+
+    async def drain():
+        # Hand results to the sink in input order, buffering any that finish early
+        pending = {}
+        next_seq = 0
+        while True:
+            item = await queues[-1].get()
+            if item is _DONE:
+                break
+            seq, key, payload = item
+            pending[seq] = (key, payload)
+            while next_seq in pending:
+                key, payload = pending.pop(next_seq)
+                if payload is not None:
+                    await asyncio.to_thread(sink, key, payload)
+                    print(f"[pipeline] {key} exported after {time.monotonic() - started:.1f}s")
+                next_seq += 1
+
+    tasks = [asyncio.ensure_future(feed())]
+    for index, stage in enumerate(stages):
+        downstream = stages[index + 1].concurrency if index + 1 < len(stages) else 1
+        tasks.append(asyncio.ensure_future(_run_stage(stage, queues[index], queues[index + 1], downstream)))
+    tasks.append(asyncio.ensure_future(drain()))
+
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    print(f"[pipeline] finished in {time.monotonic() - started:.1f}s")
+
+
+def run_pipeline(items, stages, sink, queue_size=2):
+    """
+    Stream `items` through `stages` and hand each result to `sink(key, payload)`.
+
+    Each item moves on to the next stage as soon as it is done, so downstream work
+    (and the first export) starts before upstream stages have finished every item.
+    Stages are connected by queues of `queue_size` items, so a slow stage applies
+    backpressure instead of letting finished work pile up in memory. A stage
+    returning None drops that item. The sink is called in the order of `items`.
+    """
+    if not stages:
+        raise ValueError("run_pipeline needs at least one stage")
+    asyncio.run(_run_pipeline(list(items), stages, sink, queue_size))
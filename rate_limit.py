@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Client-side token buckets for a requests-per-minute and tokens-per-minute budget.
+
+    Callers reserve one request and an estimated token count before each API call
+    and block until both buckets can cover it, so many requests can be in flight
+    without tripping the server's rate limits. After the call, `settle` corrects
+    the token bucket with the actual usage. Thread-safe.
+
+    Parameters:
+        requests_per_minute (int): Request budget; buckets start full and refill continuously.
+        tokens_per_minute (int): Token budget (prompt + completion).
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def acquire(self, tokens):
+        """
+        Block until one request and `tokens` tokens are available, then take them.
+
+        Returns:
+            float: Seconds this call spent waiting.
+        """
+        tokens = min(tokens, self.tokens_per_minute)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return waited
+                wait = max(
+                    (1 - self._requests) * 60 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60 / self.tokens_per_minute,
+                    0.01
+                )
+                self.waited += wait
+            waited += wait
+            time.sleep(wait)
+
+    def settle(self, reserved, used):
+        """Return over-reserved tokens to the bucket, or charge the shortfall."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.tokens_per_minute, self._tokens + reserved - used)
@@ -1,16 +1,127 @@
+import os
+from datetime import date
 import pandas as pd
-from scrape_schedules import scrape_team_schedules
+import dynamics_schema
+import schedule_dates
+import team_registry
+from scrape_schedules import (
+    MLB_TEAM_CODES, open_team_scraper, resolve_schedule_mode, schedule_complete, scrape_team_schedules
+)
 from scrape_venues import join_schedule_with_venues
-from generate_descriptions import generate_descriptions
+from generate_descriptions import (
+    descriptions_complete, generate_descriptions, report_description_metrics, resolve_description_mode
+)
+from description_batch import BatchPending
 from add_necassary_columns import finalize_game_info_df
+from incremental import refresh_incrementally
+from schedule_store import ScheduleStore
+from pipeline import Stage, run_pipeline
+from checkpoints import StageCheckpoints
 
-def main():
-    schedule_df = scrape_team_schedules()
-    combined_df = join_schedule_with_venues(schedule_df)
-    description_df = generate_descriptions(combined_df)
-    final_df = finalize_game_info_df(description_df)
-    final_df.to_csv("/app/static/final_draft.csv", encoding="utf-8-sig", index=False)
+OUTPUT_PATH = "/app/static/final_draft.csv"
+METRICS_PATH = "/app/static/description_metrics.json"
+# Teams described at once in streaming mode; each team's rows still go one request at a time
+DESCRIBE_CONCURRENCY = int(os.getenv("SCRAPER_DESCRIBE_CONCURRENCY", "4"))
+# Modules besides each stage function's own whose source the stage output depends on
+SCRAPE_CODE = (team_registry,)
+VENUES_CODE = (team_registry,)
+FINALIZE_CODE = (schedule_dates, dynamics_schema)
+
+def stream_season(pool_size=None, fetch_mode=None, schedule_mode=None, output_path=OUTPUT_PATH):
+    """
+    Scrape, join, describe and finalize the season one team at a time.
+
+    Each team's games move to the next stage as soon as they are scraped, so
+    descriptions start while other teams are still loading and the first team is
+    exported long before the last is scraped. Rows are appended to the CSV in
+    MLB_TEAM_CODES order, and each team's games are upserted into the schedule
+    store as they arrive. Every stage checkpoints its output per team (see
+    checkpoints.StageCheckpoints), so a rerun the same day only repeats the
+    teams and stages that did not finish.
+    """
+    checkpoints = StageCheckpoints()
+    # Pages change from day to day, and finalizing stamps today's date, so both are keyed on the day
+    today = date.today().isoformat()
+    with open_team_scraper(pool_size=pool_size, fetch_mode=fetch_mode, schedule_mode=schedule_mode) as scrape_team, \
+            open(output_path, "w", encoding="utf-8-sig", newline="") as output, ScheduleStore() as store:
+        written = []
+
+        def export(team_code, final_df):
+            store.upsert_games("MLB", final_df)
+            final_df.to_csv(output, header=not written, index=False)
+            output.flush()
+            written.append(team_code)
+
+        run_pipeline(
+            MLB_TEAM_CODES,
+            stages=[
+                Stage(
+                    "scrape",
+                    checkpoints.stage(
+                        "scrape", scrape_team, inputs=[today, resolve_schedule_mode(schedule_mode)], code=SCRAPE_CODE
+                    ),
+                    concurrency=scrape_team.pool_size
+                ),
+                Stage("venues", checkpoints.stage("venues", join_schedule_with_venues, code=VENUES_CODE)),
+                Stage(
+                    "descriptions",
+                    checkpoints.stage("descriptions", generate_descriptions, complete=descriptions_complete),
+                    concurrency=DESCRIBE_CONCURRENCY
+                ),
+                Stage("finalize", checkpoints.stage("finalize", finalize_game_info_df, inputs=today, code=FINALIZE_CODE)),
+            ],
+            sink=export
+        )
+    checkpoints.prune()
+    print(f"✅ Exported {len(written)} team(s) to {output_path}")
+
+def main(pool_size=None, fetch_mode=None, incremental=False, schedule_mode=None, describe_mode=None, wait=True):
+    describe_mode = resolve_description_mode(describe_mode)
+    if not incremental and describe_mode == "online":
+        stream_season(pool_size=pool_size, fetch_mode=fetch_mode, schedule_mode=schedule_mode)
+        report_description_metrics(METRICS_PATH)
+        return
+
+    # Offline descriptions go out as one batch job for the whole season, so this path is not streamed.
+    # Each stage's output is checkpointed; a rerun skips the stages whose inputs and code are unchanged.
+    checkpoints = StageCheckpoints()
+    today = date.today().isoformat()
+    schedule_df = checkpoints.run(
+        "scrape",
+        scrape_team_schedules,
+        inputs=[today, MLB_TEAM_CODES, resolve_schedule_mode(schedule_mode)],
+        code=SCRAPE_CODE,
+        complete=schedule_complete,
+        pool_size=pool_size,
+        fetch_mode=fetch_mode,
+        schedule_mode=schedule_mode
+    )
+    describe = lambda df: generate_descriptions(join_schedule_with_venues(df), mode=describe_mode, wait=wait)
+    with ScheduleStore() as store:
+        try:
+            if incremental:
+                # Only games whose scraped fields changed since the last run are re-joined and re-described
+                description_df = refresh_incrementally(
+                    schedule_df,
+                    store=store,
+                    process=describe,
+                    legacy_state_path="/app/static/mlb_refresh_state.json"
+                )
+            else:
+                combined_df = checkpoints.run("venues", join_schedule_with_venues, schedule_df, code=VENUES_CODE)
+                description_df = checkpoints.run(
+                    "descriptions", generate_descriptions, combined_df, complete=descriptions_complete,
+                    mode=describe_mode, wait=wait
+                )
+        except BatchPending as pending:
+            print(f"⏳ {pending}; rerun to merge its descriptions and export.")
+            return
+        finally:
+            report_description_metrics(METRICS_PATH)
+        final_df = checkpoints.run("finalize", finalize_game_info_df, description_df, inputs=today, code=FINALIZE_CODE)
+        store.upsert_games("MLB", final_df)
+    final_df.to_csv(OUTPUT_PATH, encoding="utf-8-sig", index=False)
+    checkpoints.prune()
 
 if __name__ == "__main__":
     main()
-
@@ -1,6 +1,190 @@
 import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.worksheet.table import TableList
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+import copyreg
 import os
+import pickle
+import time
+from dynamics_schema import home_teams
+from export_manifest import file_fingerprint, load_manifest, save_manifest, team_entry, workbook_hash, write_delta
+
+EXPORT_WORKERS_ENV = "SCRAPER_EXPORT_WORKERS"
+# Number formats pandas' to_excel gives datetime and date cells
+EXCEL_DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+EXCEL_DATE_FORMAT = "YYYY-MM-DD"
+
+# Pickled template workbook, set once per export worker process
+_template = None
+
+
+def resolve_export_workers(export_workers=None):
+    """Export worker processes: explicit value, then $SCRAPER_EXPORT_WORKERS, then up to 4 CPUs."""
+    if export_workers is None:
+        export_workers = os.getenv(EXPORT_WORKERS_ENV) or min(4, os.cpu_count() or 1)
+    return max(1, int(export_workers))
+
+
+def split_by_team(df):
+    """
+    (sheet name, games) per home team, in one groupby pass over `df`.
+
+    The team is the text of 'Name' before " vs"; rows without one are left out.
+    Teams come in order of their first game and sheet names are cut to Excel's
+    31 characters.
+    """
+    return [(team[:31], team_df) for team, team_df in df.groupby(home_teams(df["Name"]), sort=False)]
+
+
+def _sheet_cell(ws, value):
+    if not isinstance(value, str) and pd.isna(value):
+        return None
+    if isinstance(value, (datetime, date)):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.number_format = EXCEL_DATETIME_FORMAT if isinstance(value, datetime) else EXCEL_DATE_FORMAT
+        return cell
+    return value
+
+
+def write_team_workbook(team_frames, path):
+    """
+    Save one sheet per team to `path`, streamed with openpyxl's write-only mode.
+
+    Rows are written as they are read, so the workbook is never held as a grid of
+    cell objects. Cell values and date formats match writing each frame with
+    to_excel(index=False); missing values are left empty.
+
+    Parameters:
+    - team_frames: list - (sheet name, DataFrame) pairs, e.g. from split_by_team
+    - path: str - workbook to write
+    """
+    wb = Workbook(write_only=True)
+    for sheet_name, df in team_frames:
+        ws = wb.create_sheet(sheet_name)
+        ws.append(list(df.columns))
+        for values in df.itertuples(index=False, name=None):
+            ws.append([_sheet_cell(ws, value) for value in values])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    wb.save(path)
+
+
+def sheet_values(df):
+    """
+    `df` as it reads back from a sheet written by write_team_workbook or to_excel.
+
+    Team files used to be filled from the multi-sheet workbook after reading it
+    back, which turns empty strings into NaN and dates into Timestamps. Applying
+    the same conversions to in-memory frames keeps the template cells identical;
+    frames that were read back are left unchanged.
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            columns[col] = series
+            continue
+        values = series.to_numpy(dtype=object, copy=True)
+        values[pd.isna(values) | (values == "")] = float("nan")
+        present = values[~pd.isna(values)]
+        if len(present) and all(isinstance(value, date) for value in present):
+            values = pd.to_datetime(values)
+        columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _pickle_table_list(tables):
+    # TableList.items() yields (name, ref) pairs, so the default dict pickling would lose the tables
+    return TableList, (dict(dict.items(tables)),)
+
+
+copyreg.pickle(TableList, _pickle_table_list)
+
+
+def _set_template(template):
+    global _template
+    _template = template
+
+
+def fill_template(template, df, target_sheet="Event", start_col=4, start_row=2):
+    """
+    A copy of the pickled `template` workbook with the rows of `df` written into `target_sheet`.
+
+    Unpickling a loaded workbook is much cheaper than parsing the template file
+    again, so every team starts from the same parsed template. Rows are read
+    with itertuples instead of building a Series per row; the cells written and
+    their values are the same as writing the frame cell by cell with iterrows.
+    """
+    wb = pickle.loads(template)
+    ws = wb[target_sheet]
+    for i, values in enumerate(df.itertuples(index=False, name=None)):
+        for j, val in enumerate(values):
+            ws.cell(row=start_row + i, column=start_col + j, value=val)
+    return wb
+
+
+def team_file_path(output_dir, sheet_name):
+    sanitized_name = sheet_name.replace(" ", "_")[:31]
+    return os.path.join(output_dir, f"{sanitized_name}.xlsx")
+
+
+def _save_team_file(sheet_name, df, output_dir, target_sheet, start_col, start_row):
+    started = time.perf_counter()
+    wb = fill_template(_template, df, target_sheet, start_col, start_row)
+    output_path = team_file_path(output_dir, sheet_name)
+    wb.save(output_path)
+    return output_path, time.perf_counter() - started
+
+
+def save_team_files(team_frames, template_path, output_dir, target_sheet="Event", start_col=4, start_row=2,
+                    export_workers=None):
+    """
+    Write one Dynamics submission file per team from already-loaded frames.
+
+    The template is parsed once and handed to `export_workers` processes (see
+    resolve_export_workers), which fill and save the team files concurrently.
+    Frames can come straight from split_by_team; see sheet_values.
+
+    Parameters:
+    - team_frames: list - (sheet name, DataFrame) pairs, one per team
+    - template_path: str - path to Dynamics submission Excel template
+    - output_dir: str - where to save team-specific output files
+    - target_sheet, start_col, start_row: see generate_team_sheets_from_schedule
+    - export_workers: int - processes used to fill and save files (1 writes them in this process)
+
+    Returns:
+    - list of output paths, in the order of `team_frames`
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if not team_frames:
+        return []
+
+    started = time.perf_counter()
+    template = pickle.dumps(load_workbook(template_path))
+    export_workers = min(resolve_export_workers(export_workers), len(team_frames))
+    jobs = [
+        (sheet_name, sheet_values(df), output_dir, target_sheet, start_col, start_row)
+        for sheet_name, df in team_frames
+    ]
+
+    if export_workers == 1:
+        _set_template(template)
+        results = [_save_team_file(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=export_workers, initializer=_set_template, initargs=(template,)) as pool:
+            results = list(pool.map(_save_team_file, *zip(*jobs)))
+
+    for output_path, _ in results:
+        print(f"✅ Saved: {output_path}")
+    elapsed = time.perf_counter() - started
+    file_seconds = sum(seconds for _, seconds in results)
+    print(
+        f"Wrote {len(results)} team file(s) in {elapsed:.2f}s with {export_workers} worker(s) "
+        f"({file_seconds / len(results):.3f}s per file)."
+    )
+    return [output_path for output_path, _ in results]
+
 
 def generate_team_sheets_from_schedule(
     xlsx_path,
@@ -8,7 +192,8 @@ def generate_team_sheets_from_schedule(
     output_dir,
     target_sheet="Event",
     start_col=4,
-    start_row=2
+    start_row=2,
+    export_workers=None
 ):
     """
     Reads each sheet from `xlsx_path` and fills the data into a Dynamics submission Excel template.
@@ -21,28 +206,83 @@ def generate_team_sheets_from_schedule(
     - target_sheet: str - sheet name in the template to insert into
     - start_col: int - column index to begin writing data (default: 4, i.e., column D)
     - start_row: int - row index to begin writing data (default: 2)
+    - export_workers: int - processes writing team files (default: $SCRAPER_EXPORT_WORKERS or up to 4 CPUs)
     """
 
-    # Ensure output folder exists
-    os.makedirs(output_dir, exist_ok=True)
-
     # Load Excel file with team sheets
     xls = pd.ExcelFile(xlsx_path)
+    team_frames = [(sheet_name, xls.parse(sheet_name)) for sheet_name in xls.sheet_names]
+
+    return save_team_files(
+        team_frames,
+        template_path,
+        output_dir,
+        target_sheet=target_sheet,
+        start_col=start_col,
+        start_row=start_row,
+        export_workers=export_workers
+    )
 
-    for sheet_name in xls.sheet_names:
-        df = xls.parse(sheet_name)
 
-        # Load a fresh copy of the template each time
-        wb = load_workbook(template_path)
-        ws = wb[target_sheet]
+def export_teams(df, by_team_path, template_path, output_dir, manifest_path, delta_path, export_workers=None):
+    """
+    Write the by-team workbook and the Dynamics team files, skipping teams whose
+    games have not changed since the previous export.
 
-        # Write data starting at column D (or specified start_col)
-        for i, row in df.iterrows():
-            for j, val in enumerate(row):
-                ws.cell(row=start_row + i, column=start_col + j, value=val)
+    `manifest_path` keeps a content hash per team and per game from the last
+    export (see export_manifest). A team file is rewritten only when its hash
+    changed, the file is missing or the template changed; files of teams that
+    dropped out are deleted, and the by-team workbook is rewritten only if any
+    team changed. Unchanged files keep the 'Display Start Date' of the run that
+    wrote them. The games added, changed or removed go to `delta_path`, and the
+    manifest lists the files this run left untouched under "unchanged" (relative
+    to its directory) so uploads can skip them.
 
-        # Save one file per team/sheet
-        sanitized_name = sheet_name.replace(" ", "_")[:31]
-        output_path = os.path.join(output_dir, f"{sanitized_name}.xlsx")
-        wb.save(output_path)
-        print(f"✅ Saved: {output_path}")
+    Parameters:
+    - df: pd.DataFrame - finalized schedule with Dynamics columns
+    - by_team_path: str - multi-sheet workbook, one sheet per team
+    - template_path: str - path to Dynamics submission Excel template
+    - output_dir: str - where to save team-specific output files
+    - manifest_path: str - JSON manifest of the previous and this export
+    - delta_path: str - CSV of the games that changed since the previous export
+    - export_workers: int - see save_team_files
+    """
+    root = os.path.dirname(manifest_path) or "."
+    previous = load_manifest(manifest_path)
+    previous_teams = previous.get("teams", {})
+    template = file_fingerprint(template_path)
+    same_template = previous.get("template") == template
+
+    team_frames = split_by_team(df)
+    team_values = {sheet_name: sheet_values(team_df) for sheet_name, team_df in team_frames}
+    teams = {}
+    changed, unchanged = [], []
+    for sheet_name, team_df in team_frames:
+        output_path = team_file_path(output_dir, sheet_name)
+        teams[sheet_name] = team_entry(os.path.relpath(output_path, root), team_values[sheet_name])
+        if (same_template and os.path.exists(output_path)
+                and previous_teams.get(sheet_name, {}).get("hash") == teams[sheet_name]["hash"]):
+            unchanged.append(teams[sheet_name]["file"])
+        else:
+            changed.append((sheet_name, team_df))
+
+    for sheet_name, entry in previous_teams.items():
+        stale_path = os.path.join(root, entry["file"])
+        if sheet_name not in teams and os.path.exists(stale_path):
+            os.remove(stale_path)
+            print(f"Removed: {stale_path}")
+
+    workbook = workbook_hash(teams)
+    if previous.get("workbook") == workbook and os.path.exists(by_team_path):
+        unchanged.append(os.path.relpath(by_team_path, root))
+    else:
+        write_team_workbook(team_frames, by_team_path)
+        print(f"✅ Multi-sheet schedule saved to: {by_team_path}")
+
+    save_team_files(changed, template_path, output_dir, export_workers=export_workers)
+    counts = write_delta(delta_path, team_values, previous_teams, teams)
+    save_manifest(manifest_path, {"template": template, "workbook": workbook, "teams": teams, "unchanged": unchanged})
+    print(
+        f"✅ Export delta saved to: {delta_path} ({counts['added']} added, {counts['changed']} changed, "
+        f"{counts['removed']} removed game(s)); {len(changed)}/{len(teams)} team file(s) rewritten."
+    )
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from tzlocal import get_localzone
+
+ESPN_DATE_FORMAT = "%A, %B %d, %Y"
+ESPN_TIME_FORMAT = "%I:%M %p"
+
+
+def localize_start_dates(dates, times, timezones,
+                         date_format=ESPN_DATE_FORMAT, time_format=ESPN_TIME_FORMAT):
+    """
+    Game start times in each home team's timezone, as naive timestamps.
+
+    Schedule times are shown in the timezone of the machine that loaded the page.
+    Dates and times are parsed column-wise with fixed formats (a season has only a
+    few hundred distinct values of each), localized once, then converted one
+    home-team timezone at a time. "TBD" or unparseable times become NaT.
+    Ambiguous and missing local times resolve the way datetime.replace(tzinfo=...)
+    does (fold=0).
+
+    Parameters:
+        dates (pd.Series): Date text, e.g. "Monday, May 5, 2025".
+        times (pd.Series): Time text, e.g. "7:30 PM" or "TBD".
+        timezones (array-like): IANA timezone of each game's home team
+            (see team_registry.TEAMS), aligned with `dates`.
+
+    Returns:
+        pd.Series: Naive start timestamps, aligned with `dates`.
+    """
+    days = pd.to_datetime(dates, format=date_format, errors="coerce")
+    clock = pd.to_datetime(times, format=time_format, errors="coerce")
+    parsed = days + (clock - pd.Timestamp(1900, 1, 1))
+    local = parsed.dt.tz_localize(
+        get_localzone(),
+        ambiguous=np.ones(len(parsed), dtype=bool),
+        nonexistent=pd.Timedelta(hours=1)
+    )
+    zone_codes, zones = pd.factorize(np.asarray(timezones))
+    start_dates = pd.Series(pd.NaT, index=parsed.index, dtype=parsed.dtype)
+    for code, zone in enumerate(zones):
+        rows = zone_codes == code
+        start_dates.loc[rows] = local.loc[rows].dt.tz_convert(zone).dt.tz_localize(None)
+    return start_dates
+
+
+def display_end_dates(start_dates):
+    """Start dates, moved back to the Friday before when the game falls on a weekend."""
+    days_past_friday = (start_dates.dt.weekday - 4).clip(lower=0)
+    return start_dates - pd.to_timedelta(days_past_friday, unit="D")
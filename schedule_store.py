@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from dynamics_schema import apply_dynamics_schema, home_teams
+from export_manifest import game_keys
+
+SCHEDULE_DB_ENV = "SCHEDULE_DB_PATH"
+DEFAULT_SCHEDULE_DB = "/app/static/schedules.db"
+# Month each league's season starts; seasons crossing New Year are named after their first year
+SEASON_START_MONTH = {"NBA": 7, "NHL": 7}
+# Dynamics columns that vary per game -> store column; the constants come back from apply_dynamics_schema
+GAME_COLUMNS = {
+    "Name": "name",
+    "Description": "description",
+    "Start Date": "start_date",
+    "End Date": "end_date",
+    "Display Start Date": "display_start_date",
+    "Display End Date": "display_end_date",
+    "Venue": "venue",
+}
+# Leagues whose exports write 'Display Start Date' as a plain date rather than a datetime
+DISPLAY_START_AS_DATE = {"WNBA"}
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    game_key TEXT NOT NULL,
+    league TEXT NOT NULL,
+    season INTEGER,
+    home_team TEXT,
+    name TEXT,
+    description TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    display_start_date TEXT,
+    display_end_date TEXT,
+    venue TEXT,
+    row_hash TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    removed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS games_by_team ON games (league, season, home_team, start_date);
+CREATE INDEX IF NOT EXISTS games_by_start ON games (league, start_date);
+CREATE TABLE IF NOT EXISTS refresh_pages (
+    page TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refresh_rows (
+    page TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (page, position)
+);
+CREATE INDEX IF NOT EXISTS refresh_rows_by_fingerprint ON refresh_rows (fingerprint);
+"""
+
+
+def _chunks(values):
+    values = list(values)
+    for i in range(0, len(values), _CHUNK):
+        yield values[i:i + _CHUNK]
+
+
+def _text(values, fmt):
+    """Datetime-like column as sortable text (None where missing)."""
+    text = pd.to_datetime(values).dt.strftime(fmt)
+    return text.astype(object).where(text.notna(), None)
+
+
+def _optional(values):
+    return values.astype(object).where(values.notna(), None)
+
+
+def game_id(league, key):
+    """Stable id of a game from its league and game key (see export_manifest.game_keys)."""
+    return hashlib.sha256(f"{league}|{key}".encode("utf-8")).hexdigest()[:16]
+
+
+def seasons_of(league, start_dates):
+    """Season of each game; games without a start date get the latest season in the batch."""
+    start_month = SEASON_START_MONTH.get(league, 1)
+    seasons = start_dates.dt.year - (start_dates.dt.month < start_month)
+    seasons = seasons.fillna(seasons.max()).astype("Int64")
+    return seasons.astype(object).where(seasons.notna(), None)
+
+
+class ScheduleStore:
+    """
+    SQLite store of every game scraped, kept across seasons.
+
+    Each game is one row keyed by a stable game id, holding the per-game Dynamics
+    fields. The constant columns are added back on read. Indexes on (league,
+    season, home team, start date) and (league, start date) make the export,
+    per-team and removal queries index range scans. Games that a later scrape no
+    longer lists are marked removed rather than deleted, so past seasons stay
+    queryable while exports only load the seasons they need. The store also holds
+    the incremental-refresh state (see incremental.refresh_incrementally).
+    Thread-safe.
+
+    Parameters:
+        path (str): Database file (default: $SCHEDULE_DB_PATH or /app/static/schedules.db).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv(SCHEDULE_DB_ENV, DEFAULT_SCHEDULE_DB)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def upsert_games(self, league, df, window=None):
+        """
+        Insert new games, update changed ones and mark missing ones removed.
+
+        A game counts as changed when any stored field except 'Display Start Date'
+        differs; that date stays as first exported. Games of the home teams in
+        `df` that start inside `window` (or have no start time yet) but are no
+        longer listed are marked removed.
+
+        Parameters:
+            league (str): League of every game in `df`, e.g. "NBA".
+            df (pd.DataFrame): Finalized games with the Dynamics columns.
+            window (tuple): First and last day the scrape covered (default: the days of `df`'s games).
+
+        Returns:
+            dict: Game counts ("added", "changed", "unchanged", "removed") and the "seasons" touched.
+        """
+        df = df.reset_index(drop=True)
+        start_dates = pd.to_datetime(df["Start Date"])
+        keys = game_keys(df)
+        rows = pd.DataFrame({
+            "game_id": [game_id(league, key) for key in keys],
+            "game_key": keys,
+            "league": league,
+            "season": seasons_of(league, start_dates),
+            "home_team": _optional(home_teams(df["Name"])),
+            "name": _optional(df["Name"]),
+            "description": _optional(df["Description"]),
+            "start_date": _text(df["Start Date"], "%Y-%m-%d %H:%M:%S"),
+            "end_date": _text(df["End Date"], "%Y-%m-%d %H:%M:%S"),
+            "display_start_date": _text(df["Display Start Date"], "%Y-%m-%d"),
+            "display_end_date": _text(df["Display End Date"], "%Y-%m-%d"),
+            "venue": _optional(df["Venue"]),
+        })
+        hashed = ["name", "description", "start_date", "end_date", "display_end_date", "venue"]
+        rows["row_hash"] = [
+            hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()
+            for values in rows[hashed].itertuples(index=False, name=None)
+        ]
+
+        if window is None:
+            known = start_dates.dropna()
+            window = (known.min(), known.max()) if len(known) else None
+        now = datetime.now().isoformat(sep=" ")
+        columns = list(rows.columns) + ["first_seen", "updated_at", "last_seen"]
+        records = [(*values, now, now, now) for values in rows.itertuples(index=False, name=None)]
+        updates = ", ".join(
+            f"{col} = excluded.{col}" for col in rows.columns if col not in ("game_id", "display_start_date")
+        )
+
+        with self._lock, self._conn:
+            previous = {}
+            for ids in _chunks(rows["game_id"]):
+                previous.update(
+                    (game, (row_hash, removed_at)) for game, row_hash, removed_at in self._conn.execute(
+                        f"SELECT game_id, row_hash, removed_at FROM games WHERE game_id IN ({','.join('?' * len(ids))})",
+                        ids
+                    )
+                )
+            self._conn.executemany(
+                f"""
+                INSERT INTO games ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})
+                ON CONFLICT (game_id) DO UPDATE SET {updates},
+                    updated_at = CASE WHEN games.row_hash = excluded.row_hash AND games.removed_at IS NULL
+                                      THEN games.updated_at ELSE excluded.updated_at END,
+                    last_seen = excluded.last_seen,
+                    removed_at = NULL
+                """,
+                records
+            )
+            removed = 0
+            teams = rows["home_team"].dropna().unique().tolist()
+            if window is not None and teams:
+                first_day = pd.Timestamp(window[0]).strftime("%Y-%m-%d")
+                after_last_day = (pd.Timestamp(window[1]) + timedelta(days=1)).strftime("%Y-%m-%d")
+                for chunk in _chunks(teams):
+                    removed += self._conn.execute(
+                        f"""
+                        UPDATE games SET removed_at = ?, updated_at = ?
+                        WHERE league = ? AND (start_date >= ? AND start_date < ? OR start_date IS NULL)
+                          AND home_team IN ({','.join('?' * len(chunk))})
+                          AND removed_at IS NULL AND last_seen != ?
+                        """,
+                        [now, now, league, first_day, after_last_day, *chunk, now]
+                    ).rowcount
+
+        added = sum(game not in previous for game in rows["game_id"])
+        changed = sum(
+            game in previous and (previous[game][0] != row_hash or previous[game][1] is not None)
+            for game, row_hash in zip(rows["game_id"], rows["row_hash"])
+        )
+        counts = {
+            "added": added,
+            "changed": changed,
+            "unchanged": len(rows) - added - changed,
+            "removed": removed,
+            "seasons": sorted(int(season) for season in rows["season"].dropna().unique()),
+        }
+        print(
+            f"Schedule store: {league} {counts['added']} added, {counts['changed']} changed, "
+            f"{counts['unchanged']} unchanged, {counts['removed']} removed game(s)."
+        )
+        return counts
+
+    def games(self, league, seasons=None, home_team=None):
+        """
+        Current (not removed) games as Dynamics rows, ordered by home team and
+        start, with games whose start time is not known yet last.
+
+        Parameters:
+            league (str): League to read.
+            seasons (list): Seasons to read (default: all stored seasons).
+            home_team (str): Only this home team's games.
+
+        Returns:
+            pd.DataFrame: Games in DYNAMICS_COLUMNS layout.
+        """
+        sql = f"SELECT {', '.join(GAME_COLUMNS.values())} FROM games WHERE league = ? AND removed_at IS NULL"
+        params = [league]
+        if seasons is not None:
+            seasons = list(seasons)
+            sql += f" AND season IN ({','.join('?' * len(seasons))})"
+            params += seasons
+        if home_team is not None:
+            sql += " AND home_team = ?"
+            params.append(home_team)
+        sql += " ORDER BY home_team, start_date NULLS LAST, game_key"
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=params)
+
+        df = df.rename(columns={col: name for name, col in GAME_COLUMNS.items()})
+        for col in ("Start Date", "End Date", "Display Start Date"):
+            df[col] = pd.to_datetime(df[col])
+        if league in DISPLAY_START_AS_DATE:
+            df["Display Start Date"] = df["Display Start Date"].dt.date
+        df["Display End Date"] = pd.to_datetime(df["Display End Date"]).dt.date
+        return apply_dynamics_schema(df)
+
+    def refresh_pages(self):
+        """{page: fingerprint} saved by the last incremental refresh."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT page, fingerprint FROM refresh_pages"))
+
+    def refresh_rows(self, fingerprints):
+        """{row fingerprint: processed row} for the saved rows matching `fingerprints`."""
+        rows = {}
+        with self._lock:
+            for chunk in _chunks(set(fingerprints)):
+                rows.update(
+                    (fingerprint, json.loads(row)) for fingerprint, row in self._conn.execute(
+                        f"SELECT fingerprint, row FROM refresh_rows WHERE fingerprint IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    )
+                )
+        return rows
+
+    def save_refresh_pages(self, pages, keep):
+        """
+        Replace the saved refresh state of `pages` and drop pages not in `keep`.
+
+        Parameters:
+            pages (dict): Page -> (page fingerprint, [(row fingerprint, processed row), ...]).
+            keep (set): Every page of the current schedule; other saved pages are deleted.
+        """
+        with self._lock, self._conn:
+            stale = [page for (page,) in self._conn.execute("SELECT page FROM refresh_pages") if page not in keep]
+            for page in stale + list(pages):
+                self._conn.execute("DELETE FROM refresh_pages WHERE page = ?", (page,))
+                self._conn.execute("DELETE FROM refresh_rows WHERE page = ?", (page,))
+            for page, (fingerprint, entries) in pages.items():
+                self._conn.execute("INSERT INTO refresh_pages (page, fingerprint) VALUES (?, ?)", (page, fingerprint))
+                self._conn.executemany(
+                    "INSERT INTO refresh_rows (page, position, fingerprint, row) VALUES (?, ?, ?, ?)",
+                    [(page, position, row_fp, json.dumps(row)) for position, (row_fp, row) in enumerate(entries)]
+                )
@@ -1,16 +1,39 @@
+import asyncio
+import multiprocessing
 import os
+import re
 import time
+import numpy as np
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import logging
 from dotenv import load_dotenv
+from fetch_pages import PageFetcher
+from page_cache import CacheMiss
+from page_readiness import SiteReadiness
+from team_registry import TEAMS
 
 CHROME_BINARY = "/usr/bin/chromium-browser"
 CHROMEDRIVER_PATH = "/usr/bin/chromedriver"
 SELENIUM_REMOTE_URL = "http://localhost:4444/wd/hub"
+MLB_BASE_URL = os.getenv("MLB_BASE_URL", "https://www.mlb.com")
+MLB_EXPECTED_GAMES = 162
+MLB_SCHEDULE_ENV = "SCRAPER_MLB_SCHEDULE"
+# Schedule page variant -> (URL query, minimum game blocks on a complete page).
+# 'home' fetches only home games, so every game in the league is downloaded once.
+MLB_SCHEDULE_MODES = {
+    "fullseason": ("", MLB_EXPECTED_GAMES),
+    "home": ("?homeGame=true", 81),
+}
+
+LIST_MODE_RE = re.compile(r'class="(?:[^"]*\s)?list-mode(?:\s[^"]*)?"')
+GAME_BLOCK_RE = re.compile(r'class="(?:[^"]*\s)?list-mode-table-wrapper(?:\s[^"]*)?"')
 
 def init_driver(mode=None):
     """
@@ -42,140 +65,248 @@ def init_driver(mode=None):
     else:
         raise ValueError(f"Unknown mode '{mode}': must be 'docker', 'local', or None")
 
-def scrape_team_schedules(max_retries=5):
-    print("Starting team schedules scraping.")
+MLB_TEAM_CODES = [
+    "dbacks", "braves", "orioles", "redsox", "cubs", "whitesox",
+    "reds", "guardians", "rockies", "tigers", "astros", "royals",
+    "angels", "dodgers", "marlins", "brewers", "twins", "mets",
+    "yankees", "athletics", "phillies", "pirates", "padres", "giants",
+    "mariners", "cardinals", "rays", "rangers", "bluejays", "nationals"
+]
 
-    # Define your team codes
-    team_codes = [
-        "dbacks", "braves", "orioles", "redsox", "cubs", "whitesox",
-        "reds", "guardians", "rockies", "tigers", "astros", "royals",
-        "angels", "dodgers", "marlins", "brewers", "twins", "mets",
-        "yankees", "athletics", "phillies", "pirates", "padres", "giants",
-        "mariners", "cardinals", "rays", "rangers", "bluejays", "nationals"
-    ]
+def resolve_schedule_mode(schedule_mode=None):
+    """Schedule page variant: explicit value, then $SCRAPER_MLB_SCHEDULE, then 'fullseason'."""
+    schedule_mode = schedule_mode or os.getenv(MLB_SCHEDULE_ENV) or "fullseason"
+    if schedule_mode not in MLB_SCHEDULE_MODES:
+        raise ValueError(
+            f"Unknown MLB schedule mode '{schedule_mode}': must be one of {', '.join(MLB_SCHEDULE_MODES)}"
+        )
+    return schedule_mode
 
-    driver = init_driver()
-    game_data = []
+def mlb_page_ready(html, expected_games=MLB_EXPECTED_GAMES):
+    """
+    Cheap readiness check on raw HTML: the 'list-mode' container is present and
+    holds at least `expected_games` game blocks. Pages failing it need a browser render.
+    """
+    return bool(LIST_MODE_RE.search(html)) and len(GAME_BLOCK_RE.findall(html)) >= expected_games
+
+def mlb_readiness(expected_games):
+    """In the browser: wait until the expected game blocks are present and have stopped growing."""
+    return SiteReadiness(
+        "mlb.com",
+        html_check=lambda html: mlb_page_ready(html, expected_games),
+        count_script="return document.querySelectorAll('div.list-mode-table-wrapper').length;",
+        min_count=expected_games,
+        max_timeout=15.0
+    )
+
+def _class_xpath(class_name):
+    return etree.XPath(
+        f'.//div[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]'
+    )
+
+GAME_BLOCK_XPATH = _class_xpath("list-mode-table-wrapper")
+MONTH_DATE_XPATH = _class_xpath("month-date")
+WEEKDAY_XPATH = _class_xpath("weekday")
+PRIMARY_TIME_XPATH = _class_xpath("primary-time")
+
+def _first_text(block, xpath):
+    """Text of the first match, stripped and joined like BeautifulSoup's get_text(strip=True)."""
+    tags = xpath(block)
+    if not tags:
+        return None
+    return "".join(text.strip() for text in tags[0].itertext())
+
+def resolve_parse_workers(parse_workers=None):
+    """Parse worker processes: explicit value, then $SCRAPER_PARSE_WORKERS, then up to 4 CPUs."""
+    if parse_workers is None:
+        parse_workers = os.getenv("SCRAPER_PARSE_WORKERS") or min(4, os.cpu_count() or 1)
+    return max(1, int(parse_workers))
+
+def open_parse_pool(parse_workers=None):
+    """
+    Process pool for parse_team_schedule. Its workers start lazily, on a submit
+    from a fetch thread, so they come from a forkserver (spawn where there is
+    none) instead of forking a process that has other threads running.
+    """
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=resolve_parse_workers(parse_workers),
+        mp_context=multiprocessing.get_context(start_method)
+    )
+
+def fetch_team_schedule(fetcher, team_code, max_retries=5, schedule_mode="fullseason"):
+    """
+    Fetch a team's season schedule page, retrying until it holds the 'list-mode'
+    container and the game blocks expected for `schedule_mode`. Without a browser
+    to render the page ('http' and 'replay' modes) a retry would get the same
+    HTML, so the first incomplete page is final.
 
-    # Loop over each team code and scrape the schedule
-    for team_code in team_codes:
-        url = f"https://www.mlb.com/{team_code}/schedule/2025/fullseason"
-        print(f"Processing team: {team_code} at URL: {url}")
-        print(team_code)
-
-        retry_count = 0
-        while retry_count < max_retries:
-            driver.get(url)
-            time.sleep(4)  # Adjust sleep as needed for page load
-
-            html = driver.page_source
-            soup = BeautifulSoup(html, "html.parser")
-            
-            # Attempt to locate the parent container
-            div_element = soup.find("div", class_="list-mode")
-            if not div_element:
-                print(f"Team {team_code}: No 'list-mode' div found.")
-                retry_count += 1
+    Returns the page HTML, or None if every attempt failed or, in replay mode,
+    the page was never cached.
+    """
+    query, expected_games = MLB_SCHEDULE_MODES[schedule_mode]
+    readiness = mlb_readiness(expected_games)
+    url = f"{MLB_BASE_URL}/{team_code}/schedule/2025/fullseason{query}"
+    print(f"Processing team: {team_code} at URL: {url}")
+
+    if not fetcher.renders_in_browser:
+        max_retries = 1
+    retry_count = 0
+    while retry_count < max_retries:
+        try:
+            html = fetcher.fetch(url, ready=readiness)
+        except CacheMiss as e:
+            # Replaying again would miss again; skip this team like any other failed fetch
+            print(f"Team {team_code}: {e.args[0]}")
+            return None
+
+        # Attempt to locate the parent container
+        if not LIST_MODE_RE.search(html):
+            print(f"Team {team_code}: No 'list-mode' div found.")
+            retry_count += 1
+            if retry_count < max_retries:
                 print(f"Retrying ({retry_count}/{max_retries})...")
-                continue
-
-            all_blocks = soup.find_all("div", class_="list-mode-table-wrapper")
-            print(f"Team {team_code}: Found {len(all_blocks)} game blocks.")
-            print(len(all_blocks))
-            if len(all_blocks) < 162:
-                print(f"Team {team_code}: Found {len(all_blocks)} games, expected 163. Retrying...")
-                retry_count += 1
+            continue
+
+        block_count = len(GAME_BLOCK_RE.findall(html))
+        print(f"Team {team_code}: Found {block_count} game blocks.")
+        if block_count < expected_games:
+            print(f"Team {team_code}: Found {block_count} games, expected {expected_games}.")
+            retry_count += 1
+            if retry_count < max_retries:
                 print(f"Retrying ({retry_count}/{max_retries})...")
-                continue
-
-            # Process each game block
-            for i, block in enumerate(all_blocks, start=1):
-                matchup = block.get("data-tracking-matchup-with-date")
-                if not matchup:
-                    print(f"Team {team_code} Block {i}: No matchup attribute found, skipping.")
-                    continue
-
-                if " vs " not in matchup or "@" in matchup:
-                    print(f"Team {team_code} Block {i}: Skipping due to format.")
-                    continue
-
-                teams_part = matchup.split(" on ")[0]
-                teams = teams_part.split(" vs ")
-
-                date_tag = block.find("div", class_="month-date")
-                weekday_tag = block.find("div", class_="weekday")
-                time_tag = block.find("div", class_="primary-time")
-
-                game_date = date_tag.get_text(strip=True) if date_tag else None
-                day_of_week = weekday_tag.get_text(strip=True) if weekday_tag else None
-                game_time = time_tag.get_text(strip=True) if time_tag else None
-
-                promo_text = block.get("data-tracking-featured-promotion", None)
-
-                if len(teams) == 2:
-                    home_team = teams[0].strip()
-                    away_team = teams[1].strip()
-                    print(f"Team {team_code} Block {i}: Home: {home_team}, Away: {away_team}")
-                    game_data.append({
-                        "Home Team": home_team,
-                        "Away Team": away_team,
-                        "Game Date": game_date,
-                        "Day": day_of_week,
-                        "Game Time": game_time,
-                        "Promo": promo_text,
-                    })
-                else:
-                    print(f"Team {team_code} Block {i}: Unexpected team format: {matchup}")
-
-            # If we've successfully scraped 81 games, break out of the retry loop
-            print(f"Successfully scraped 162 games for team {team_code}.")
-            break
-
-        if retry_count == max_retries:
-            print(f"Failed to scrape 181 games for team {team_code} after {max_retries} attempts.")
+            continue
+
+        return html
+
+    print(f"Failed to scrape {expected_games} games for team {team_code} after {max_retries} attempts.")
+    return None
+
+def parse_team_schedule(html, team_code):
+    """
+    Extract the home games from a team's full-season schedule page.
+
+    Only the markup from the 'list-mode' container onwards is parsed, with lxml, and
+    only the game-block subtrees are visited. Runs in a worker process so parsing
+    overlaps with fetching the next page.
+
+    Returns:
+        tuple: (list of game dicts, number of game blocks parsed, parse seconds)
+    """
+    started = time.perf_counter()
+    match = LIST_MODE_RE.search(html)
+    if not match:
+        return [], 0, time.perf_counter() - started
+    root = lxml.html.fromstring(html[html.rfind("<", 0, match.start()):])
+
+    game_data = []
+    skipped = 0
+    blocks = GAME_BLOCK_XPATH(root)
+    for i, block in enumerate(blocks, start=1):
+        matchup = block.get("data-tracking-matchup-with-date")
+        if not matchup or " vs " not in matchup or "@" in matchup:
+            skipped += 1
+            continue
+
+        teams_part = matchup.split(" on ")[0]
+        teams = teams_part.split(" vs ")
 
+        if len(teams) != 2:
+            print(f"Team {team_code} Block {i}: Unexpected team format: {matchup}")
+            continue
 
+        game_data.append({
+            "Home Team": teams[0].strip(),
+            "Away Team": teams[1].strip(),
+            "Game Date": _first_text(block, MONTH_DATE_XPATH),
+            "Day": _first_text(block, WEEKDAY_XPATH),
+            "Game Time": _first_text(block, PRIMARY_TIME_XPATH),
+            "Promo": block.get("data-tracking-featured-promotion", None),
+        })
+
+    print(f"Team {team_code}: {len(game_data)} home games, {skipped} away or unlabelled blocks skipped.")
+    return game_data, len(blocks), time.perf_counter() - started
+
+def build_schedule_df(game_data):
+    """Build the schedule DataFrame from parsed games, with full team names and a game 'Name'."""
     # Create a DataFrame from the collected data
-    df = pd.DataFrame(game_data)
-
-    # Map abbreviated team codes to full names (adjust mapping as needed)
-    team_mapping = {
-        'AZ': 'Arizona Diamondbacks',
-        'BAL': 'Baltimore Orioles',
-        'BOS': 'Boston Red Sox',
-        'CWS': 'Chicago White Sox',
-        'CIN': 'Cincinnati Reds',
-        'CLE': 'Cleveland Guardians',
-        'COL': 'Colorado Rockies',
-        'DET': 'Detroit Tigers',
-        'HOU': 'Houston Astros',
-        'KC': 'Kansas City Royals',
-        'LAA': 'Los Angeles Angels',
-        'LAD': 'Los Angeles Dodgers',
-        'MIA': 'Miami Marlins',
-        'MIL': 'Milwaukee Brewers',
-        'NYM': 'New York Mets',
-        'NYY': 'New York Yankees',
-        'ATH': 'Athletics',
-        'PHI': 'Philadelphia Phillies',
-        'PIT': 'Pittsburgh Pirates',
-        'SD': 'San Diego Padres',
-        'SF': 'San Francisco Giants',
-        'SEA': 'Seattle Mariners',
-        'STL': 'St. Louis Cardinals',
-        'TEX': 'Texas Rangers',
-        'TOR': 'Toronto Blue Jays',
-        'WSH': 'Washington Nationals',
-        'MIN': 'Minnesota Twins',
-        'CHC': 'Chicago Cubs',
-        'TB': 'Tampa Bay Rays',
-        'ATL': 'Atlanta Braves'
-    }
-
-    df['Home Team'] = df['Home Team'].map(team_mapping)
-    df['Away Team'] = df['Away Team'].map(team_mapping)
+    df = pd.DataFrame(game_data, columns=["Home Team", "Away Team", "Game Date", "Day", "Game Time", "Promo"])
+
+    # Abbreviations -> full names through the team registry; unknown codes become NaN
+    df['Home Team'] = TEAMS.take("names", TEAMS.team_ids(df['Home Team'], "MLB"), np.nan)
+    df['Away Team'] = TEAMS.take("names", TEAMS.team_ids(df['Away Team'], "MLB"), np.nan)
     df["Name"] = df["Home Team"] + " vs. " + df["Away Team"]
+    return df
+
+def schedule_complete(df):
+    """True when `df` holds home games of every team in MLB_TEAM_CODES (no team failed to scrape)."""
+    return df["Home Team"].nunique() == len(MLB_TEAM_CODES)
+
+@contextmanager
+def open_team_scraper(max_retries=5, pool_size=None, fetch_mode=None, parse_workers=None, schedule_mode=None):
+    """
+    Yield a coroutine function `scrape_team(team_code)` returning one team's home
+    games as a DataFrame (None if the page could not be scraped), for callers that
+    stream teams through later stages instead of waiting for the whole league.
+    Fetching and the parse process pool are shared and closed on exit.
+    """
+    schedule_mode = resolve_schedule_mode(schedule_mode)
+    with PageFetcher(init_driver, pool_size, fetch_mode) as fetcher, \
+            open_parse_pool(parse_workers) as parse_pool:
+
+        async def scrape_team(team_code):
+            html = await asyncio.to_thread(fetch_team_schedule, fetcher, team_code, max_retries, schedule_mode)
+            if html is None:
+                return None
+            loop = asyncio.get_running_loop()
+            games, _, _ = await loop.run_in_executor(parse_pool, parse_team_schedule, html, team_code)
+            return build_schedule_df(games) if games else None
+
+        scrape_team.pool_size = fetcher.pool_size
+        yield scrape_team
+
+def scrape_team_schedules(max_retries=5, pool_size=None, fetch_mode=None, parse_workers=None, schedule_mode=None):
+    """
+    Scrape every MLB team's home schedule.
+
+    `schedule_mode` picks the page variant (see MLB_SCHEDULE_MODES): 'fullseason'
+    pages list all 162 games and away games are dropped while parsing; 'home'
+    pages list only the team's home games, halving the bytes fetched and parsed.
+
+    Teams are fanned out across `pool_size` concurrent fetches (see
+    driver_pool.resolve_pool_size). Pages come over plain HTTP where possible and
+    fall back to a browser session when not rendered (see fetch_pages.PageFetcher).
+    Each fetched page is handed to a pool of `parse_workers` processes, so parsing
+    overlaps with the next page load. Results are merged in MLB_TEAM_CODES order,
+    so the returned DataFrame does not depend on which fetch finished first.
+    """
+    print("Starting team schedules scraping.")
+    schedule_mode = resolve_schedule_mode(schedule_mode)
+
+    with PageFetcher(init_driver, pool_size, fetch_mode) as fetcher, \
+            open_parse_pool(parse_workers) as parse_pool:
+        print(f"Using {fetcher.pool_size} concurrent fetch(es) in '{fetcher.mode}' mode, '{schedule_mode}' pages.")
+
+        def fetch_and_parse(team_code):
+            html = fetch_team_schedule(fetcher, team_code, max_retries, schedule_mode)
+            if html is None:
+                return None
+            return parse_pool.submit(parse_team_schedule, html, team_code)
+
+        parse_jobs = fetcher.map(fetch_and_parse, MLB_TEAM_CODES)
+        parsed = [job.result() if job is not None else ([], 0, 0.0) for job in parse_jobs]
+
+    per_team = [games for games, _, _ in parsed]
+    blocks_parsed = sum(blocks for _, blocks, _ in parsed)
+    parse_seconds = sum(seconds for _, _, seconds in parsed)
+    if parse_seconds > 0:
+        print(
+            f"Parsed {blocks_parsed} game blocks in {parse_seconds:.2f}s of worker time "
+            f"({blocks_parsed / parse_seconds:.0f} blocks/s)."
+        )
+
+    game_data = [game for games in per_team for game in games]
+    df = build_schedule_df(game_data)
 
     print("Completed team schedules scraping.")
-    driver.quit()
     return df
@@ -1,5 +1,20 @@
 #!/bin/bash
-/opt/bin/entry_point.sh &  # Start Selenium in background
-sleep 5
-python3 main.py "$1"
-
+# Plain-HTTP and replay modes never open a browser, so the Selenium hub is not
+# needed. Otherwise start it in the background; the scrapers retry session
+# creation while it boots, so there is no fixed wait here.
+# The fetch mode is resolved like main.py does: the last command-line flag wins
+# over $SCRAPER_FETCH_MODE.
+fetch_mode="${SCRAPER_FETCH_MODE:-auto}"
+args=("$@")
+for ((i = 0; i < ${#args[@]}; i++)); do
+    case "${args[i]}" in
+        --replay) fetch_mode=replay ;;
+        --fetch-mode=*) fetch_mode="${args[i]#--fetch-mode=}" ;;
+        --fetch-mode) fetch_mode="${args[i + 1]}" ;;
+    esac
+done
+case "$fetch_mode" in
+    http|replay) ;;
+    *) /opt/bin/entry_point.sh & ;;  # Start Selenium in background
+esac
+python3 main.py "$@"
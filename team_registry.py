@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+# Full team name -> (aliases, venue, timezone). Aliases are the other spellings the
+# schedule sites use (MLB.com abbreviations, ESPN city names). MLB.com already shows
+# local start times, so MLB teams carry no timezone.
+
+MLB_TEAMS = {
+    "Arizona Diamondbacks": (("AZ",), "Chase Field", None),
+    "Baltimore Orioles": (("BAL",), "Oriole Park at Camden Yards", None),
+    "Boston Red Sox": (("BOS",), "Fenway Park", None),
+    "Chicago White Sox": (("CWS",), "Guaranteed Rate Field", None),
+    "Cincinnati Reds": (("CIN",), "Great American Ball Park", None),
+    "Cleveland Guardians": (("CLE",), "Progressive Field", None),
+    "Colorado Rockies": (("COL",), "Coors Field", None),
+    "Detroit Tigers": (("DET",), "Comerica Park", None),
+    "Houston Astros": (("HOU",), "Minute Maid Park", None),
+    "Kansas City Royals": (("KC",), "Kauffman Stadium", None),
+    "Los Angeles Angels": (("LAA",), "Angel Stadium", None),
+    "Los Angeles Dodgers": (("LAD",), "Dodger Stadium", None),
+    "Miami Marlins": (("MIA",), "LoanDepot Park", None),
+    "Milwaukee Brewers": (("MIL",), "American Family Field", None),
+    "New York Mets": (("NYM",), "Citi Field", None),
+    "New York Yankees": (("NYY",), "Yankee Stadium", None),
+    "Athletics": (("ATH",), "Oakland Coliseum", None),
+    "Philadelphia Phillies": (("PHI",), "Citizens Bank Park", None),
+    "Pittsburgh Pirates": (("PIT",), "PNC Park", None),
+    "San Diego Padres": (("SD",), "Petco Park", None),
+    "San Francisco Giants": (("SF",), "Oracle Park", None),
+    "Seattle Mariners": (("SEA",), "T-Mobile Park", None),
+    "St. Louis Cardinals": (("STL",), "Busch Stadium", None),
+    "Texas Rangers": (("TEX",), "Globe Life Field", None),
+    "Toronto Blue Jays": (("TOR",), "Rogers Centre", None),
+    "Washington Nationals": (("WSH",), "Nationals Park", None),
+    "Minnesota Twins": (("MIN",), "Target Field", None),
+    "Chicago Cubs": (("CHC",), "Wrigley Field", None),
+    "Tampa Bay Rays": (("TB",), "Tropicana Field", None),
+    "Atlanta Braves": (("ATL",), "Truist Park", None),
+}
+
+NBA_TEAMS = {
+    "Atlanta Hawks": (("Atlanta",), "State Farm Arena", "America/New_York"),
+    "Boston Celtics": (("Boston",), "TD Garden", "America/New_York"),
+    "Brooklyn Nets": (("Brooklyn",), "Barclays Center", "America/New_York"),
+    "Charlotte Hornets": (("Charlotte",), "Spectrum Center", "America/New_York"),
+    "Chicago Bulls": (("Chicago",), "United Center", "America/Chicago"),
+    "Cleveland Cavaliers": (("Cleveland",), "Rocket Mortgage FieldHouse", "America/New_York"),
+    "Dallas Mavericks": (("Dallas",), "American Airlines Center", "America/Chicago"),
+    "Denver Nuggets": (("Denver",), "Ball Arena", "America/Denver"),
+    "Detroit Pistons": (("Detroit",), "Little Caesars Arena", "America/Detroit"),
+    "Golden State Warriors": (("Golden State",), "Chase Center", "America/Los_Angeles"),
+    "Houston Rockets": (("Houston",), "Toyota Center", "America/Chicago"),
+    "Indiana Pacers": (("Indiana",), "Gainbridge Fieldhouse", "America/Indiana/Indianapolis"),
+    "Los Angeles Clippers": (("LA Clippers",), "Crypto.com Arena", "America/Los_Angeles"),
+    "Los Angeles Lakers": (("L.A. Lakers",), "Crypto.com Arena", "America/Los_Angeles"),
+    "Memphis Grizzlies": (("Memphis",), "FedExForum", "America/Chicago"),
+    "Miami Heat": (("Miami",), "Kaseya Center", "America/New_York"),
+    "Milwaukee Bucks": (("Milwaukee",), "Fiserv Forum", "America/Chicago"),
+    "Minnesota Timberwolves": (("Minnesota",), "Target Center", "America/Chicago"),
+    "New Orleans Pelicans": (("New Orleans",), "Smoothie King Center", "America/Chicago"),
+    "New York Knicks": (("New York",), "Madison Square Garden", "America/New_York"),
+    "Oklahoma City Thunder": (("Oklahoma City",), "Paycom Center", "America/Chicago"),
+    "Orlando Magic": (("Orlando",), "Amway Center", "America/New_York"),
+    "Philadelphia 76ers": (("Philadelphia",), "Wells Fargo Center", "America/New_York"),
+    "Phoenix Suns": (("Phoenix",), "Footprint Center", "America/Phoenix"),
+    "Portland Trail Blazers": (("Portland",), "Moda Center", "America/Los_Angeles"),
+    "Sacramento Kings": (("Sacramento",), "Golden 1 Center", "America/Los_Angeles"),
+    "San Antonio Spurs": (("San Antonio",), "Frost Bank Center", "America/Chicago"),
+    "Toronto Raptors": (("Toronto",), "Scotiabank Arena", "America/Toronto"),
+    "Utah Jazz": (("Utah",), "Delta Center", "America/Denver"),
+    "Washington Wizards": (("Washington",), "Capital One Arena", "America/New_York"),
+}
+
+NHL_TEAMS = {
+    "Anaheim Ducks": (("Anaheim",), "Honda Center", "America/Los_Angeles"),
+    "Arizona Coyotes": (("Arizona",), "Mullett Arena", "America/Phoenix"),
+    "Boston Bruins": (("Boston",), "TD Garden", "America/New_York"),
+    "Buffalo Sabres": (("Buffalo",), "KeyBank Center", "America/New_York"),
+    "Calgary Flames": (("Calgary",), "Scotiabank Saddledome", "America/Edmonton"),
+    "Carolina Hurricanes": (("Carolina",), "PNC Arena", "America/New_York"),
+    "Chicago Blackhawks": (("Chicago",), "United Center", "America/Chicago"),
+    "Colorado Avalanche": (("Colorado",), "Ball Arena", "America/Denver"),
+    "Columbus Blue Jackets": (("Columbus",), "Nationwide Arena", "America/New_York"),
+    "Dallas Stars": (("Dallas",), "American Airlines Center", "America/Chicago"),
+    "Detroit Red Wings": (("Detroit",), "Little Caesars Arena", "America/Detroit"),
+    "Edmonton Oilers": (("Edmonton",), "Rogers Place", "America/Edmonton"),
+    "Florida Panthers": (("Florida",), "Amerant Bank Arena", "America/New_York"),
+    "Los Angeles Kings": (("Los Angeles",), "Crypto.com Arena", "America/Los_Angeles"),
+    "Minnesota Wild": (("Minnesota",), "Xcel Energy Center", "America/Chicago"),
+    "Montreal Canadiens": (("Montreal",), "Bell Centre", "America/Toronto"),
+    "Nashville Predators": (("Nashville",), "Bridgestone Arena", "America/Chicago"),
+    "New Jersey Devils": (("New Jersey",), "Prudential Center", "America/New_York"),
+    "New York Islanders": (("NY Islanders",), "UBS Arena", "America/New_York"),
+    "New York Rangers": (("NY Rangers",), "Madison Square Garden", "America/New_York"),
+    "Ottawa Senators": (("Ottawa",), "Canadian Tire Centre", "America/Toronto"),
+    "Philadelphia Flyers": (("Philadelphia",), "Wells Fargo Center", "America/New_York"),
+    "Pittsburgh Penguins": (("Pittsburgh",), "PPG Paints Arena", "America/New_York"),
+    "San Jose Sharks": (("San Jose",), "SAP Center", "America/Los_Angeles"),
+    "Seattle Kraken": (("Seattle",), "Climate Pledge Arena", "America/Los_Angeles"),
+    "St. Louis Blues": (("St. Louis",), "Enterprise Center", "America/Chicago"),
+    "Tampa Bay Lightning": (("Tampa Bay",), "Amalie Arena", "America/New_York"),
+    "Toronto Maple Leafs": (("Toronto",), "Scotiabank Arena", "America/Toronto"),
+    "Vancouver Canucks": (("Vancouver",), "Rogers Arena", "America/Vancouver"),
+    "Vegas Golden Knights": (("Vegas",), "T-Mobile Arena", "America/Los_Angeles"),
+    "Washington Capitals": (("Washington",), "Capital One Arena", "America/New_York"),
+    "Winnipeg Jets": (("Winnipeg",), "Canada Life Centre", "America/Winnipeg"),
+}
+
+WNBA_TEAMS = {
+    "Atlanta Dream": (("Atlanta",), "Gateway Center Arena", "America/New_York"),
+    "Chicago Sky": (("Chicago",), "Wintrust Arena", "America/Chicago"),
+    "Connecticut Sun": (("Connecticut",), "Mohegan Sun Arena", "America/New_York"),
+    "Dallas Wings": (("Dallas",), "College Park Center", "America/Chicago"),
+    "Indiana Fever": (("Indiana",), "Gainbridge Fieldhouse", "America/Indiana/Indianapolis"),
+    "Las Vegas Aces": (("Las Vegas",), "Michelob Ultra Arena", "America/Los_Angeles"),
+    "Los Angeles Sparks": (("Los Angeles",), "Crypto.com Arena", "America/Los_Angeles"),
+    "Minnesota Lynx": (("Minnesota",), "Target Center", "America/Chicago"),
+    "New York Liberty": (("New York",), "Barclays Center", "America/New_York"),
+    "Phoenix Mercury": (("Phoenix",), "Footprint Center", "America/Phoenix"),
+    "Seattle Storm": (("Seattle",), "Climate Pledge Arena", "America/Los_Angeles"),
+    "Washington Mystics": (("Washington",), "Entertainment and Sports Arena", "America/New_York"),
+    "Golden State Valkyries": (("Golden State",), "Chase Center", "America/Los_Angeles"),
+}
+
+LEAGUE_TEAMS = {"MLB": MLB_TEAMS, "NBA": NBA_TEAMS, "NHL": NHL_TEAMS, "WNBA": WNBA_TEAMS}
+
+
+class TeamRegistry:
+    """
+    Every team across the leagues, compiled to small integer ids.
+
+    Team attributes live in arrays indexed by id (`names`, `venues`, `timezones`,
+    `leagues`), and each league has one alias table covering full names and
+    aliases. A schedule column is resolved by factorizing it into codes, looking
+    up each distinct value once and indexing the result with the codes, so
+    enrichment is array indexing instead of a string merge or a dict lookup per row.
+
+    Parameters:
+        leagues (dict): League -> {full team name: (aliases, venue, timezone)}.
+    """
+
+    def __init__(self, leagues):
+        names, venues, timezones, team_leagues = [], [], [], []
+        self._aliases = {}
+        for league, teams in leagues.items():
+            aliases = self._aliases.setdefault(league, {})
+            for name, (team_aliases, venue, timezone) in teams.items():
+                team_id = len(names)
+                names.append(name)
+                venues.append(venue)
+                timezones.append(timezone)
+                team_leagues.append(league)
+                for alias in (name, *team_aliases):
+                    aliases[alias] = team_id
+        self.names = np.array(names, dtype=object)
+        self.venues = np.array(venues, dtype=object)
+        self.timezones = np.array(timezones, dtype=object)
+        self.leagues = np.array(team_leagues, dtype=object)
+
+    def team_ids(self, values, league):
+        """
+        Team ids for a column of full names or aliases.
+
+        Parameters:
+            values (pd.Series): Team names or aliases as they appear in a schedule.
+            league (str): League whose alias table is used, e.g. "NBA".
+
+        Returns:
+            np.ndarray: int16 team id per row, -1 where the value is unknown or missing.
+        """
+        codes, uniques = pd.factorize(values)
+        aliases = self._aliases[league]
+        # One extra -1 at the end, so missing values (code -1) index to "unknown"
+        unique_ids = np.array([aliases.get(value, -1) for value in uniques] + [-1], dtype=np.int16)
+        return unique_ids[codes]
+
+    def take(self, attribute, team_ids, default):
+        """
+        An attribute array ('names', 'venues', 'timezones' or 'leagues') indexed by `team_ids`.
+
+        Rows with an unknown team (-1) get `default`, which may be a scalar or an
+        array aligned with `team_ids` (e.g. the original values).
+        """
+        values = getattr(self, attribute).take(np.maximum(team_ids, 0))
+        return np.where(team_ids >= 0, values, default)
+
+
+TEAMS = TeamRegistry(LEAGUE_TEAMS)
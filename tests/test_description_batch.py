@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pandas as pd
+from openai import OpenAI
+
+# generate_descriptions builds its client on import; the tests swap it for one pointed at the stub
+os.environ.setdefault("OPENAI_API_KEY", "test")
+import generate_descriptions  # noqa: E402
+from description_batch import BatchPending  # noqa: E402
+
+PROMO_RE = re.compile(r"\*\*Promo:\*\* (.*)")
+
+
+def stub_description(promo):
+    # Long random tail so no two promos' descriptions count as near-duplicates
+    return f"{generate_descriptions.DESCRIPTION_PREFIX} {promo} {hashlib.sha256(promo.encode()).hexdigest()}"
+
+
+class BatchStubHandler(BaseHTTPRequestHandler):
+    """Stand-in for the /v1/files and /v1/batches endpoints of one batch job."""
+
+    lock = threading.Lock()
+    # custom_id -> promo of every request uploaded so far
+    uploaded = {}
+    batches_created = 0
+    status = "in_progress"
+
+    def _send_json(self, data):
+        self._send(json.dumps(data).encode("utf-8"), "application/json")
+
+    def _send(self, payload, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _batch(self):
+        return {
+            "id": "batch-stub",
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": "file-input",
+            "completion_window": "24h",
+            "created_at": 0,
+            "status": BatchStubHandler.status,
+            "output_file_id": "file-output" if BatchStubHandler.status == "completed" else None,
+        }
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with BatchStubHandler.lock:
+            if self.path == "/v1/files":
+                # The multipart upload carries the JSONL input file; pick its request lines out of it
+                for line in body.decode("utf-8").splitlines():
+                    if line.startswith('{"custom_id"'):
+                        request = json.loads(line)
+                        prompt = request["body"]["messages"][0]["content"]
+                        BatchStubHandler.uploaded[request["custom_id"]] = PROMO_RE.search(prompt).group(1)
+                self._send_json({
+                    "id": "file-input", "object": "file", "bytes": len(body), "created_at": 0,
+                    "filename": "description_batch.jsonl", "purpose": "batch", "status": "processed",
+                })
+            elif self.path == "/v1/batches":
+                BatchStubHandler.batches_created += 1
+                self._send_json(self._batch())
+            else:
+                self.send_error(404)
+
+    def do_GET(self):
+        with BatchStubHandler.lock:
+            if self.path == "/v1/batches/batch-stub":
+                self._send_json(self._batch())
+            elif self.path == "/v1/files/file-output/content":
+                # Answered out of request order, so results can only be matched by custom_id
+                answers = list(BatchStubHandler.uploaded.items())
+                random.shuffle(answers)
+                lines = [
+                    json.dumps({
+                        "custom_id": custom_id,
+                        "response": {
+                            "status_code": 200,
+                            "body": {
+                                "choices": [{"message": {"content": stub_description(promo)}}],
+                                "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70},
+                            },
+                        },
+                    })
+                    for custom_id, promo in answers
+                ]
+                self._send("\n".join(lines).encode("utf-8"), "application/jsonl")
+            else:
+                self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DescriptionBatchTest(unittest.TestCase):
+    """generate_descriptions in offline mode against a local batch API stub."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), BatchStubHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/v1"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        BatchStubHandler.uploaded = {}
+        BatchStubHandler.batches_created = 0
+        BatchStubHandler.status = "in_progress"
+        self.state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_dir)
+        self.state_path = os.path.join(self.state_dir, "description_batch.json")
+        patchers = [
+            mock.patch.dict(os.environ, {
+                "DESCRIPTION_CACHE_PATH": os.path.join(self.state_dir, "description_cache.json"),
+                "DESCRIPTION_JOURNAL_PATH": os.path.join(self.state_dir, "description_journal.jsonl"),
+                "DESCRIPTION_BATCH_STATE": self.state_path,
+            }),
+            mock.patch.object(generate_descriptions, "client", OpenAI(base_url=self.base_url, api_key="test")),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.new_run()
+
+    def new_run(self):
+        # A later run starts without the previous run's cache, journal and duplicate index in memory
+        for name in ("_description_cache", "_description_journal", "_duplicate_index"):
+            patcher = mock.patch.object(generate_descriptions, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_pending_batch_is_resumed_and_merged_by_custom_id(self):
+        promos = [f"Jersey night {n}" for n in range(6)]
+        games = pd.DataFrame({
+            "Home Team": "Chicago Cubs",
+            "Away Team": "St. Louis Cardinals",
+            "Game Date": [f"Game {n}" for n in range(len(promos))],
+            "Day": "Sat",
+            "Game Time": "1:20 PM",
+            "Promo": promos,
+        })
+
+        with self.assertRaises(BatchPending) as pending:
+            generate_descriptions.generate_descriptions(games.copy(), mode="offline", wait=False)
+        self.assertEqual(pending.exception.batch_id, "batch-stub")
+        self.assertEqual(BatchStubHandler.batches_created, 1)
+        self.assertEqual(sorted(BatchStubHandler.uploaded.values()), sorted(promos))
+        with open(self.state_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["batch_id"], "batch-stub")
+
+        BatchStubHandler.status = "completed"
+        self.new_run()
+        df = generate_descriptions.generate_descriptions(games.copy(), mode="offline", wait=False)
+        self.assertEqual(list(df["Description"]), [stub_description(promo) for promo in promos])
+        # Resumed from the state file instead of submitting a second batch, which is then cleared
+        self.assertEqual(BatchStubHandler.batches_created, 1)
+        self.assertFalse(os.path.exists(self.state_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
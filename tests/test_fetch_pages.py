@@ -0,0 +1,97 @@
+import os
+import threading
+import unittest
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import espn_schedule
+import scrape_schedules
+from fetch_pages import PageFetcher
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+# URL path prefix -> saved page served for it
+PAGES = {
+    "/yankees/schedule/": "mlb_home_schedule.html",
+    "/mets/schedule/": "mlb_not_rendered.html",
+    "/nba/schedule/": "espn_schedule.html",
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def do_GET(self):
+        for prefix, name in PAGES.items():
+            if self.path.startswith(prefix):
+                FixtureHandler.hits[prefix] = FixtureHandler.hits.get(prefix, 0) + 1
+                with open(os.path.join(FIXTURES, name), "rb") as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpFetchTest(unittest.TestCase):
+    """PageFetcher in 'http' mode against saved MLB and ESPN pages on a local server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FixtureHandler.hits.clear()
+        # No page cache, so every fetch reaches the fixture server
+        patcher = mock.patch.dict(os.environ, {"SCRAPER_CACHE_TTL_HOURS": "0"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.fetcher = PageFetcher(driver_factory=None, pool_size=1, mode="http")
+        self.addCleanup(self.fetcher.close)
+
+    def test_mlb_page(self):
+        with mock.patch.object(scrape_schedules, "MLB_BASE_URL", self.base_url):
+            html = scrape_schedules.fetch_team_schedule(self.fetcher, "yankees", schedule_mode="home")
+        self.assertIsNotNone(html)
+        games, blocks, _ = scrape_schedules.parse_team_schedule(html, "yankees")
+        self.assertEqual(blocks, 81)
+        df = scrape_schedules.build_schedule_df(games)
+        self.assertEqual(len(df), 81)
+        self.assertEqual(set(df["Home Team"]), {"New York Yankees"})
+        self.assertFalse(df["Away Team"].isna().any())
+        self.assertEqual(self.fetcher.stats["http"], 1)
+
+    def test_unrendered_mlb_page_is_fetched_once(self):
+        with mock.patch.object(scrape_schedules, "MLB_BASE_URL", self.base_url):
+            html = scrape_schedules.fetch_team_schedule(self.fetcher, "mets", schedule_mode="home")
+        self.assertIsNone(html)
+        self.assertEqual(FixtureHandler.hits, {"/mets/schedule/": 1})
+
+    def test_espn_page(self):
+        with mock.patch.object(espn_schedule, "ESPN_BASE_URL", self.base_url):
+            games = espn_schedule.scrape_espn_schedule(self.fetcher, "nba", datetime(2025, 5, 15), datetime(2025, 5, 15))
+        self.assertEqual(
+            [(game["date"], game["home_team"], game["away_team"], game["time"]) for game in games],
+            [
+                ("Thursday, May 15, 2025", "New York", "Boston", "7:00 PM"),
+                ("Thursday, May 15, 2025", "Oklahoma City", "Denver", "9:30 PM"),
+                ("Friday, May 16, 2025", "Golden State", "Minnesota", "TBD"),
+            ]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
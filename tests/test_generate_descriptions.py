@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pandas as pd
+from openai import OpenAI
+
+# generate_descriptions builds its client on import; the tests swap it for one pointed at the stub
+os.environ.setdefault("OPENAI_API_KEY", "test")
+import generate_descriptions  # noqa: E402
+from rate_limit import RateLimiter  # noqa: E402
+
+ROW_PROMPT_RE = re.compile(r"\*\*Promo:\*\* (.*)")
+BATCH_GAME_RE = re.compile(r"\*\*Game (\d+):\*\* Promo: (.*?) \| Time:")
+
+
+def stub_description(promo):
+    # Long random tail so no two promos' descriptions count as near-duplicates
+    return f"{generate_descriptions.DESCRIPTION_PREFIX} {promo} {hashlib.sha256(promo.encode()).hexdigest()}"
+
+
+class ChatStubHandler(BaseHTTPRequestHandler):
+    """Stand-in for /v1/chat/completions that describes each game by its promo."""
+
+    requests = []
+    lock = threading.Lock()
+    # Promos a batched answer leaves out, every time or only while other games are in the batch
+    always_missing = set()
+    missing_unless_alone = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"]
+        batched = "response_format" in body
+        if batched:
+            games = [(int(game), promo) for game, promo in BATCH_GAME_RE.findall(prompt)]
+            answered = [
+                {"id": game, "description": stub_description(promo)}
+                for game, promo in games
+                if promo not in ChatStubHandler.always_missing
+                and (promo not in ChatStubHandler.missing_unless_alone or len(games) == 1)
+            ]
+            content = json.dumps({"descriptions": answered})
+            promos = [promo for _, promo in games]
+        else:
+            promo = ROW_PROMPT_RE.search(prompt).group(1)
+            content = stub_description(promo)
+            promos = [promo]
+        with ChatStubHandler.lock:
+            ChatStubHandler.requests.append((time.monotonic(), batched, promos))
+        # Finish out of order, so write-back cannot rely on completion order
+        time.sleep(random.uniform(0, 0.02))
+
+        payload = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def games_df(promos):
+    return pd.DataFrame({
+        "Home Team": "New York Yankees",
+        "Away Team": "Boston Red Sox",
+        "Game Date": [f"Game {n}" for n in range(len(promos))],
+        "Day": "Fri",
+        "Game Time": "7:05 PM",
+        "Promo": promos,
+    })
+
+
+class GenerateDescriptionsTest(unittest.TestCase):
+    """generate_descriptions in online mode against a local chat completions stub."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ChatStubHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/v1"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ChatStubHandler.requests = []
+        ChatStubHandler.always_missing = set()
+        ChatStubHandler.missing_unless_alone = set()
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_dir)
+        # Fresh cache, journal and duplicate index per test, kept out of /app/static
+        patchers = [
+            mock.patch.dict(os.environ, {
+                "DESCRIPTION_CACHE_PATH": os.path.join(state_dir, "description_cache.json"),
+                "DESCRIPTION_JOURNAL_PATH": os.path.join(state_dir, "description_journal.jsonl"),
+            }),
+            mock.patch.object(generate_descriptions, "client", OpenAI(base_url=self.base_url, api_key="test")),
+            mock.patch.object(generate_descriptions, "rate_limiter", RateLimiter(10_000, 10_000_000)),
+            mock.patch.object(generate_descriptions, "_description_cache", None),
+            mock.patch.object(generate_descriptions, "_description_journal", None),
+            mock.patch.object(generate_descriptions, "_duplicate_index", None),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def assertDescribedByOwnPromo(self, df, promos):
+        self.assertEqual(list(df["Description"]), [stub_description(promo) for promo in promos])
+
+    def test_descriptions_written_back_in_row_order(self):
+        promos = [f"Bobblehead night {n}" for n in range(12)]
+        df = generate_descriptions.generate_descriptions(games_df(promos), max_workers=6, batch_size=1)
+        self.assertDescribedByOwnPromo(df, promos)
+        self.assertEqual(len(ChatStubHandler.requests), len(promos))
+
+    def test_rate_limiter_holds_request_budget(self):
+        # The bucket starts with 60 requests and refills one per second, so 62 requests need 2 seconds
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=10_000_000)
+        created = time.monotonic()
+        promos = [f"Fireworks night {n}" for n in range(62)]
+        with mock.patch.object(generate_descriptions, "rate_limiter", limiter):
+            df = generate_descriptions.generate_descriptions(games_df(promos), max_workers=8, batch_size=1)
+        self.assertDescribedByOwnPromo(df, promos)
+        arrivals = sorted(arrived for arrived, _, _ in ChatStubHandler.requests)
+        self.assertEqual(len(arrivals), 62)
+        for n, arrived in enumerate(arrivals, start=1):
+            self.assertGreaterEqual(arrived - created, (n - 60) * 1.0 - 0.05)
+        self.assertGreater(limiter.waited, 0)
+
+    def test_games_missing_from_partial_answer_are_resent(self):
+        promos = [f"Cap giveaway {n}" for n in range(10)]
+        ChatStubHandler.missing_unless_alone = {promos[2], promos[7]}
+        df = generate_descriptions.generate_descriptions(games_df(promos), max_workers=2, batch_size=5)
+        self.assertDescribedByOwnPromo(df, promos)
+        # Each batch of five loses one game, which is re-sent in a batch of its own
+        self.assertTrue(all(batched for _, batched, _ in ChatStubHandler.requests))
+        self.assertEqual(
+            sorted(len(promos_sent) for _, _, promos_sent in ChatStubHandler.requests), [1, 1, 5, 5]
+        )
+
+    def test_game_never_answered_in_a_batch_falls_back_to_its_own_prompt(self):
+        promos = [f"Fleece blanket {n}" for n in range(5)]
+        ChatStubHandler.always_missing = {promos[3]}
+        df = generate_descriptions.generate_descriptions(games_df(promos), max_workers=1, batch_size=5)
+        self.assertDescribedByOwnPromo(df, promos)
+        single = [promos_sent for _, batched, promos_sent in ChatStubHandler.requests if not batched]
+        self.assertEqual(single, [[promos[3]]])
+        self.assertEqual(len(ChatStubHandler.requests), generate_descriptions.BATCH_ATTEMPTS + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()